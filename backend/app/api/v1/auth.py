@@ -1,33 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Form
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, get_password_hash
+from sqlalchemy import select, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db, open_session
+from app.core.security import verify_password, create_access_token, get_password_hash, create_refresh_token, hash_refresh_token, password_needs_rehash
 from app.core.config import settings
+from app.core.user_cache import user_cache, snapshot_user, restore_user, publish_user_changed, publish_sessions_changed
+from app.core.revocation import revocation_index, mark_session_revoked
+from app.core.audit import audit_log
+from app.core.rate_limit import login_limiter
+from app.core.metrics import totp_verify_seconds
+from app.core.totp import totp_verifier, publish_totp_used
+from app.core.backup_codes import is_backup_code, redeem_backup_code
+from app.core.profiling import mark_profile_user
+from app.core.activity import session_activity
+from app.core.queries import user_for_login, user_by_username
 from app.models.user import User
 from app.models.session import Session as UserSession
-from app.models.user_secret import UserSecret
-from app.schemas.token import Token
+from app.schemas.token import Token, RefreshTokenRequest
 from datetime import timedelta, datetime, timezone
-import secrets
-import pyotp
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+async def _rehash_password(user_id, username: str, old_hash: str, password: str) -> None:
+    # Runs after the response is sent. Only replaces the hash it was computed
+    # for, so a password changed in the meantime is never overwritten.
+    try:
+        new_hash = await get_password_hash(password)
+        async with open_session() as db:
+            result = await db.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            if result.rowcount:
+                await publish_user_changed(db, username)
+            await db.commit()
+    except Exception:
+        # The next login tries again
+        logger.exception("Rehashing the password of user %s failed", user_id)
+
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
     request: Request,
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     otp: str | None = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    client_host = request.client.host if request.client else None
+    # Locked (ip, identifier) pairs are turned away before any query or bcrypt work
+    login_limiter.check(client_host, form_data.username)
+
     # Determine if login is by email or username (form_data.username can be either)
     # The frontend usually sends 'username' field, but user might type email
-    user = db.query(User).filter(
-        (User.email == form_data.username) | (User.username == form_data.username)
-    ).first()
+    # The TOTP secret comes along in the same query, a 2FA login needs no second one.
+    # Either is matched case-insensitively.
+    row = (await db.execute(user_for_login(form_data.username))).first()
+    user, totp_secret = row if row is not None else (None, None)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
+        login_limiter.record_failure(client_host, form_data.username)
+        audit_log.record(
+            "login_failed",
+            user_id=user.id if user else None,
+            request=request,
+            details={"identifier": form_data.username},
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -47,42 +89,61 @@ async def login_for_access_token(
             )
         
         # Verify OTP
-        user_secret = db.query(UserSecret).filter(UserSecret.user_id == user.id).first()
-        if not user_secret or not user_secret.totp_secret:
+        if not totp_secret:
              # Should not happen if is_2fa_enabled is true, but fail safe
              raise HTTPException(status_code=400, detail="2FA configuration error")
              
-        totp = pyotp.TOTP(user_secret.totp_secret)
-        if not totp.verify(otp, valid_window=1):
+        totp_step = None
+        if is_backup_code(otp):
+            # Removed in this transaction, committed together with the new session
+            otp_valid = await redeem_backup_code(db, user.id, otp)
+        else:
+            with totp_verify_seconds.time():
+                totp_step = totp_verifier.verify(user.id, totp_secret, otp)
+            otp_valid = totp_step is not None
+        if not otp_valid:
+             login_limiter.record_failure(client_host, form_data.username)
+             audit_log.record("login_failed", user_id=user.id, request=request, details={"reason": "invalid_2fa"})
              raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid 2FA code",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+    login_limiter.record_success(client_host, form_data.username)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     # Create Session
-    refresh_token = secrets.token_urlsafe(32)
+    refresh_token = create_refresh_token()
     user_agent = request.headers.get("user-agent")
-    client_host = request.client.host if request.client else None
     
     new_session = UserSession(
         user_id=user.id,
-        refresh_token=refresh_token,
+        refresh_token_hash=hash_refresh_token(refresh_token),
         user_agent=user_agent,
         ip_address=client_host,
         expires_at=datetime.now(timezone.utc) + timedelta(days=7) # 7 days refresh token
     )
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session) # Get ID
+    await publish_sessions_changed(db, [user.id])
+    if user.is_2fa_enabled and totp_step is not None:
+        await publish_totp_used(db, user.id, totp_step)
+    await db.commit()
+    await db.refresh(new_session) # Get ID
 
     access_token = create_access_token(
         subject=user.username, 
         expires_delta=access_token_expires,
         session_id=str(new_session.id)
     )
+    if settings.PASSWORD_REHASH_ON_LOGIN and password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(
+            _rehash_password, user.id, user.username, user.hashed_password, form_data.password
+        )
+    login_details = {"session_id": str(new_session.id)}
+    if user.is_2fa_enabled and totp_step is None:
+        login_details["backup_code"] = True
+    audit_log.record("login", user_id=user.id, request=request, details=login_details)
     
     return {
         "access_token": access_token, 
@@ -90,6 +151,62 @@ async def login_for_access_token(
         "refresh_token": refresh_token 
     }
 
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    request: Request,
+    payload: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    invalid_token_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    digest = hash_refresh_token(payload.refresh_token)
+
+    # Row lock so two concurrent refreshes with the same token cannot both rotate it
+    row = (await db.execute(
+        select(UserSession, User)
+        .join(User, User.id == UserSession.user_id)
+        .where(or_(
+            UserSession.refresh_token_hash == digest,
+            UserSession.previous_refresh_token_hash == digest,
+        ))
+        .with_for_update(of=UserSession)
+    )).first()
+    if row is None:
+        raise invalid_token_exception
+    session, user = row
+
+    if session.previous_refresh_token_hash == digest:
+        # An already rotated token came back: treat the session as stolen
+        if not session.is_revoked:
+            await mark_session_revoked(db, session)
+            await db.commit()
+        audit_log.record("refresh_token_reuse", user_id=user.id, request=request, details={"session_id": str(session.id)})
+        raise invalid_token_exception
+
+    if session.is_revoked or session.expires_at <= datetime.now(timezone.utc) or not user.is_active:
+        raise invalid_token_exception
+
+    refresh_token = create_refresh_token()
+    session.previous_refresh_token_hash = session.refresh_token_hash
+    session.refresh_token_hash = hash_refresh_token(refresh_token)
+    session.last_active_at = datetime.now(timezone.utc)
+    await db.commit()
+
+    access_token = create_access_token(
+        subject=user.username,
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        session_id=str(session.id)
+    )
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token
+    }
+
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from app.core.config import settings
@@ -97,7 +214,7 @@ from app.core.security import ALGORITHM, SECRET_KEY
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -112,11 +229,46 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
         
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    if session_id and revocation_index.is_revoked(session_id):
         raise credentials_exception
         
+    cached = user_cache.get(username)
+    if cached is not None:
+        user = restore_user(cached)
+    else:
+        user = await db.scalar(user_by_username(username))
+        if user is None:
+            raise credentials_exception
+        user_cache.set(username, snapshot_user(user))
+        
+    if session_id:
+        session_activity.touch(session_id)
+    mark_profile_user(user)
+        
     # Attach current session ID to user instance for downstream usage
     user.current_session_id = session_id
     
     return user
+
+async def get_current_admin(current_user: User = Depends(get_current_user)):
+    if not settings.is_admin_role(current_user.role):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    session_id = getattr(current_user, "current_session_id", None)
+    if session_id:
+        session = await db.scalar(select(UserSession).where(
+            UserSession.id == session_id,
+            UserSession.user_id == current_user.id
+        ))
+        if session and not session.is_revoked:
+            await mark_session_revoked(db, session)
+            await db.commit()
+    audit_log.record("logout", user_id=current_user.id, request=request, details={"session_id": session_id})
+    return None
@@ -1,57 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from pydantic import TypeAdapter
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.api.v1.auth import get_current_user
+from app.core.revocation import mark_session_revoked
+from app.core.audit import audit_log
+from app.core.serialization import construct, json_response
+from app.core.etag import REVALIDATE, etag_matches, not_modified, weak_etag
 from app.models.user import User
 from app.models.session import Session as SessionModel
 from app.schemas.session import SessionRead
 
 router = APIRouter()
 
+_session_columns = [getattr(SessionModel, name) for name in SessionRead.model_fields if name != "is_current"]
+_session_list = TypeAdapter(List[SessionRead])
+
 @router.get("/", response_model=List[SessionRead])
-def get_user_sessions(
+async def get_user_sessions(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    sessions = db.query(SessionModel).filter(
-        SessionModel.user_id == current_user.id,
-        SessionModel.is_revoked == False
-    ).order_by(SessionModel.last_active_at.desc()).all()
-    
     # Check current session
     current_sid = getattr(current_user, "current_session_id", None)
-    
-    # Convert to schema compatible list (Pydantic models from ORM)
-    # We can't just modify ORM objects in place easily for non-column attributes without setup, 
-    # but we can return Pydantic models directly if configured.
-    # However, since we defined is_current in Schema but it's not in DB, we need to calculate it.
-    
-    result = []
-    for s in sessions:
-        # Create Pydantic model
-        s_data = SessionRead.model_validate(s)
-        s_data.is_current = (str(s.id) == str(current_sid)) if current_sid else False
-        result.append(s_data)
-        
-    return result
+
+    # Weak: last_active_at moves without a version bump. is_current depends
+    # on the token, so its session is part of the tag.
+    etag = weak_etag(current_user.id.hex, current_user.sessions_version, current_sid or "")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    rows = (await db.execute(select(*_session_columns).where(
+        SessionModel.user_id == current_user.id,
+        SessionModel.is_revoked == False
+    ).order_by(SessionModel.last_active_at.desc()))).all()
+
+    # is_current is not a column, it is filled in while building the models
+    sessions = [
+        construct(SessionRead, row, is_current=str(row.id) == current_sid)
+        for row in rows
+    ]
+    return json_response(_session_list.dump_json(sessions), headers={"ETag": etag, "Cache-Control": REVALIDATE})
 
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
-def revoke_session(
+async def revoke_session(
+    request: Request,
     session_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    session = db.query(SessionModel).filter(
+    session = await db.scalar(select(SessionModel).where(
         SessionModel.id == session_id,
         SessionModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
         
-    session.is_revoked = True
-    db.commit()
+    await mark_session_revoked(db, session)
+    await db.commit()
+    audit_log.record("session_revoke", user_id=current_user.id, request=request, details={"session_id": str(session.id)})
     return None
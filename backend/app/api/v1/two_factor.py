@@ -1,83 +1,166 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.api.v1.auth import get_current_user
+from app.core.user_cache import publish_user_changed
+from app.core.audit import audit_log
+from app.core.metrics import totp_verify_seconds
+from app.core.totp import totp_verifier, publish_totp_used
+from app.core.backup_codes import generate_backup_codes
+from app.core.queries import user_secret_by_user_id
+from app.core.config import settings
+from app.core.etag import etag_matches, not_modified, weak_etag
+from app.core.qr import MEDIA_TYPES, render_qr_async, secret_fingerprint
 from app.models.user import User
 from app.models.user_secret import UserSecret
-from app.schemas.two_factor import TwoFactorSetupResponse, TwoFactorEnableRequest, TwoFactorVerifyRequest
+from app.schemas.two_factor import (
+    TwoFactorSetupResponse, TwoFactorEnableRequest, TwoFactorVerifyRequest, BackupCodesResponse, BackupCodesStatus
+)
 import pyotp
-import qrcode
-import io
-import base64
 
 router = APIRouter()
 
+def _provisioning_uri(secret: str, email: str) -> str:
+    return pyotp.totp.TOTP(secret).provisioning_uri(name=email, issuer_name="Arima Web")
+
 @router.post("/setup", response_model=TwoFactorSetupResponse)
-def setup_two_factor(
+async def setup_two_factor(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Generate random secret
     secret = pyotp.random_base32()
     
-    # Generate Provisioning URI (for QR Code)
-    uri = pyotp.totp.TOTP(secret).provisioning_uri(
-        name=current_user.email, 
-        issuer_name="Arima Web"
-    )
-    
-    # Generate QR Code Image -> Base64
-    img = qrcode.make(uri)
-    buffered = io.BytesIO()
-    img.save(buffered, format="PNG")
-    img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
-    qr_code_url = f"data:image/png;base64,{img_str}"
+    # The image is served by /setup/qr behind the access token, so the JSON
+    # stays small and the secret never sits in a URL that logs could record
+    qr_code_url = request.app.url_path_for("get_two_factor_qr")
     
     # Store secret temporarily or update existing?
     # Better to store in UserSecrets but NOT enable it yet.
     
-    user_secret = db.query(UserSecret).filter(UserSecret.user_id == current_user.id).first()
+    user_secret = await db.scalar(user_secret_by_user_id(current_user.id))
     if not user_secret:
         user_secret = UserSecret(user_id=current_user.id, totp_secret=secret)
         db.add(user_secret)
     else:
         user_secret.totp_secret = secret # Update with new secret
         
-    db.commit()
+    await db.commit()
+    totp_verifier.invalidate(current_user.id)
+    response.headers["Cache-Control"] = "no-store"
     
     return {"secret": secret, "qr_code_url": qr_code_url}
 
+@router.get("/setup/qr", name="get_two_factor_qr")
+async def get_two_factor_qr(
+    request: Request,
+    format: str = Query("svg", pattern="^(svg|png)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """QR code of the secret pending confirmation, for an authenticated fetch into a blob URL."""
+    totp_secret = await db.scalar(select(UserSecret.totp_secret).where(UserSecret.user_id == current_user.id))
+    # Only until 2FA is enabled; a new setup replaces the secret and so the ETag
+    if current_user.is_2fa_enabled or not totp_secret:
+        raise HTTPException(status_code=404, detail="No pending 2FA setup")
+
+    etag = weak_etag(secret_fingerprint(totp_secret), format)
+    cache_control = f"private, max-age={settings.TWO_FACTOR_QR_MAX_AGE_SECONDS}"
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    content = await render_qr_async(_provisioning_uri(totp_secret, current_user.email), format)
+    return Response(content, media_type=MEDIA_TYPES[format], headers={
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Authorization",
+    })
+
 @router.post("/enable", status_code=status.HTTP_204_NO_CONTENT)
-def enable_two_factor(
+async def enable_two_factor(
+    request: Request,
     payload: TwoFactorEnableRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_secret = db.query(UserSecret).filter(UserSecret.user_id == current_user.id).first()
+    user_secret = await db.scalar(user_secret_by_user_id(current_user.id))
     if not user_secret or not user_secret.totp_secret:
         raise HTTPException(status_code=400, detail="2FA setup not initiated")
         
-    totp = pyotp.TOTP(user_secret.totp_secret)
-    if not totp.verify(payload.token, valid_window=1):
+    with totp_verify_seconds.time():
+        totp_step = totp_verifier.verify(current_user.id, user_secret.totp_secret, payload.token)
+    if totp_step is None:
         raise HTTPException(status_code=400, detail="Invalid verification code")
         
     # Enable 2FA for user
     current_user.is_2fa_enabled = True
-    db.commit()
+    db.add(current_user)
+    await publish_totp_used(db, current_user.id, totp_step)
+    await publish_user_changed(db, current_user.username)
+    await db.commit()
+    audit_log.record("2fa_enable", user_id=current_user.id, request=request)
     return None
 
 @router.post("/disable", status_code=status.HTTP_204_NO_CONTENT)
-def disable_two_factor(
+async def disable_two_factor(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     current_user.is_2fa_enabled = False
+    db.add(current_user)
     
     # Optional: Clear secret or keep it? 
     # Usually better to clear it to force new setup next time.
-    user_secret = db.query(UserSecret).filter(UserSecret.user_id == current_user.id).first()
+    user_secret = await db.scalar(user_secret_by_user_id(current_user.id))
     if user_secret:
-        db.delete(user_secret)
+        await db.delete(user_secret)
         
-    db.commit()
+    await publish_user_changed(db, current_user.username)
+    await db.commit()
+    totp_verifier.invalidate(current_user.id)
+    audit_log.record("2fa_disable", user_id=current_user.id, request=request)
     return None
+
+@router.get("/backup-codes", response_model=BackupCodesStatus)
+async def get_backup_codes_status(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    remaining = await db.scalar(
+        select(func.coalesce(func.jsonb_array_length(UserSecret.backup_codes), 0))
+        .where(UserSecret.user_id == current_user.id)
+    )
+    return {"remaining": remaining or 0}
+
+@router.post("/backup-codes", response_model=BackupCodesResponse)
+async def regenerate_backup_codes(
+    request: Request,
+    response: Response,
+    payload: TwoFactorVerifyRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if not current_user.is_2fa_enabled:
+        raise HTTPException(status_code=400, detail="2FA is not enabled")
+    user_secret = await db.scalar(user_secret_by_user_id(current_user.id))
+    if not user_secret or not user_secret.totp_secret:
+        raise HTTPException(status_code=400, detail="2FA configuration error")
+
+    with totp_verify_seconds.time():
+        totp_step = totp_verifier.verify(current_user.id, user_secret.totp_secret, payload.token)
+    if totp_step is None:
+        raise HTTPException(status_code=400, detail="Invalid verification code")
+
+    # Replaces every earlier code
+    codes, digests = generate_backup_codes(current_user.id)
+    user_secret.backup_codes = digests
+    user_secret.updated_at = func.now()
+    await publish_totp_used(db, current_user.id, totp_step)
+    await db.commit()
+    audit_log.record("2fa_backup_codes_regenerate", user_id=current_user.id, request=request)
+    response.headers["Cache-Control"] = "no-store"
+    return {"codes": codes}
@@ -1,21 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.api.v1.auth import get_current_user
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+from pydantic import TypeAdapter
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status, Request
+from sqlalchemy import delete, func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.api.v1.auth import get_current_user, get_current_admin
+from app.core.pagination import encode_cursor, decode_cursor, like_pattern
+from app.core.user_import import UserImporter, detect_format
+from app.core.serialization import construct, json_response
+from app.core.etag import REVALIDATE, etag_matches, not_modified, weak_etag
+from app.core.user_cache import publish_user_changed
+from app.core.security import verify_password, verify_password_any, get_password_hash
+from app.core.revocation import publish_session_revoked
+from app.core.rate_limit import login_limiter
+from app.core.config import settings
+from app.core.audit import audit_log, audit_log_window, select_audit_logs
 from app.models.user import User
-from app.schemas.user import UserRead, UserUpdate
+from app.models.audit_log import AuditLog
+from app.models.password_history import PasswordHistory
+from app.models.session import Session as SessionModel
+from app.schemas.user import UserRead, UserUpdate, UserListItem, UserPage, UserImportReport, PasswordChangeRequest
+from app.schemas.audit_log import AuditLogRead
 
 router = APIRouter()
 
+_list_columns = [getattr(User, name) for name in UserListItem.model_fields]
+_user_read = TypeAdapter(UserRead)
+
+@router.get("/", response_model=UserPage)
+async def list_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    is_2fa_enabled: Optional[bool] = None,
+    # Trigrams need at least three characters to narrow the search
+    q: Optional[str] = Query(None, min_length=3, max_length=100),
+    current_user: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Keyset pagination: every page is an index range scan from the cursor,
+    # however deep it is
+    query = select(*_list_columns).order_by(User.created_at.desc(), User.id.desc())
+    if cursor:
+        query = query.where(tuple_(User.created_at, User.id) < decode_cursor(cursor))
+    if role is not None:
+        query = query.where(User.role == role)
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    if is_2fa_enabled is not None:
+        query = query.where(User.is_2fa_enabled == is_2fa_enabled)
+    if q:
+        pattern = like_pattern(q)
+        query = query.where(or_(*(
+            column.ilike(pattern, escape="\\")
+            for column in (User.email, User.username, User.first_name, User.last_name)
+        )))
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    items = [UserListItem.model_validate(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return UserPage(items=items, next_cursor=next_cursor)
+
+@router.post("/import", response_model=UserImportReport)
+async def import_users(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    on_conflict: str = Query("skip", pattern="^(skip|update)$"),
+    current_user: User = Depends(get_current_admin),
+):
+    # The upload is spooled to a temporary file and read back in batches
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Cannot tell the file format, pass format=csv or format=ndjson")
+    report = await UserImporter(on_conflict=on_conflict).run(file.file, fmt)
+    audit_log.record(
+        "user_import",
+        user_id=current_user.id,
+        request=request,
+        details={"filename": file.filename, **report.model_dump(exclude={"errors"})},
+    )
+    return report
+
+def _profile_etag(user: User) -> str:
+    # Every profile write moves updated_at, so the (usually cached) user row decides
+    changed_at = user.updated_at or user.created_at
+    return weak_etag(user.id.hex, int(changed_at.timestamp() * 1_000_000))
+
 @router.get("/me", response_model=UserRead)
-def read_users_me(current_user: User = Depends(get_current_user)):
-    return current_user
+async def read_users_me(request: Request, current_user: User = Depends(get_current_user)):
+    etag = _profile_etag(current_user)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return json_response(
+        _user_read.dump_json(construct(UserRead, current_user)),
+        headers={"ETag": etag, "Cache-Control": REVALIDATE},
+    )
 
 @router.put("/me", response_model=UserRead)
-def update_user_me(
+async def update_user_me(
+    request: Request,
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Only update fields that are provided (not None)
     update_data = user_update.model_dump(exclude_unset=True)
@@ -24,6 +114,105 @@ def update_user_me(
         setattr(current_user, key, value)
     
     db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    await publish_user_changed(db, current_user.username)
+    await db.commit()
+    await db.refresh(current_user)
+    audit_log.record("profile_update", user_id=current_user.id, request=request, details={"fields": sorted(update_data)})
+    return json_response(
+        _user_read.dump_json(construct(UserRead, current_user)),
+        headers={"ETag": _profile_etag(current_user), "Cache-Control": REVALIDATE},
+    )
+
+@router.get("/me/audit-logs", response_model=List[AuditLogRead])
+async def read_my_audit_logs(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    since, until = audit_log_window(since, until)
+    return (await db.scalars(
+        select_audit_logs(since, until).where(AuditLog.user_id == current_user.id).limit(limit)
+    )).all()
+
+@router.post("/me/password", status_code=status.HTTP_204_NO_CONTENT)
+async def change_password(
+    request: Request,
+    payload: PasswordChangeRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    client_host = request.client.host if request.client else None
+    login_limiter.check(client_host, current_user.username)
+
+    # Fresh from the database, the cached user may predate a rehash
+    old_hash = await db.scalar(select(User.hashed_password).where(User.id == current_user.id))
+    history = (await db.scalars(
+        select(PasswordHistory.hashed_password)
+        .where(PasswordHistory.user_id == current_user.id)
+        .order_by(PasswordHistory.created_at.desc())
+        .limit(settings.PASSWORD_HISTORY_DEPTH)
+    )).all()
+
+    # Current password check, history check and the new hash all run on the
+    # pool at once, so the whole change costs about one hash
+    check_current = asyncio.ensure_future(verify_password(payload.current_password, old_hash))
+    check_reuse = asyncio.ensure_future(verify_password_any(payload.new_password, [old_hash, *history]))
+    new_hash = asyncio.ensure_future(get_password_hash(payload.new_password))
+    try:
+        if not await check_current:
+            login_limiter.record_failure(client_host, current_user.username)
+            audit_log.record("password_change_failed", user_id=current_user.id, request=request)
+            raise HTTPException(status_code=400, detail="Current password is incorrect")
+        if await check_reuse:
+            raise HTTPException(status_code=400, detail="New password must differ from recent passwords")
+        hashed_password = await new_hash
+    finally:
+        for task in (check_current, check_reuse, new_hash):
+            task.cancel()
+    login_limiter.record_success(client_host, current_user.username)
+
+    # Conditional on the hash that was verified, so concurrent changes cannot both win
+    result = await db.execute(
+        update(User)
+        .where(User.id == current_user.id, User.hashed_password == old_hash)
+        .values(hashed_password=hashed_password, updated_at=func.now(), sessions_version=User.sessions_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Password was changed concurrently, please retry")
+
+    await db.execute(insert(PasswordHistory).values(user_id=current_user.id, hashed_password=old_hash))
+    newest = (
+        select(PasswordHistory.id)
+        .where(PasswordHistory.user_id == current_user.id)
+        .order_by(PasswordHistory.created_at.desc())
+        .limit(settings.PASSWORD_HISTORY_DEPTH)
+    )
+    await db.execute(
+        delete(PasswordHistory)
+        .where(PasswordHistory.user_id == current_user.id, PasswordHistory.id.not_in(newest))
+        .execution_options(synchronize_session=False)
+    )
+
+    # Every other session has to log in again with the new password
+    current_sid = getattr(current_user, "current_session_id", None)
+    others = update(SessionModel).where(SessionModel.user_id == current_user.id, SessionModel.is_revoked == False)
+    if current_sid:
+        others = others.where(SessionModel.id != current_sid)
+    revoked = (await db.execute(
+        others.values(is_revoked=True, revoked_at=func.now())
+        .returning(SessionModel.id, SessionModel.expires_at)
+        .execution_options(synchronize_session=False)
+    )).all()
+    for session_id, expires_at in revoked:
+        await publish_session_revoked(db, session_id, expires_at)
+
+    await publish_user_changed(db, current_user.username)
+    await db.commit()
+    audit_log.record(
+        "password_change", user_id=current_user.id, request=request, details={"sessions_revoked": len(revoked)}
+    )
+    return None
@@ -0,0 +1,96 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict
+from sqlalchemy import DateTime, column, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.metrics import register_stats_source
+from app.core.periodic import PeriodicTask
+from app.models.session import Session as SessionModel
+
+logger = logging.getLogger(__name__)
+
+
+class SessionActivityTracker:
+    """Write-behind buffer for auth.sessions.last_active_at.
+
+    Requests only record the latest timestamp per session in memory; a
+    background task writes them in one batched UPDATE per flush interval,
+    so the write rate follows the number of active sessions rather than
+    the number of requests.
+    """
+
+    def __init__(self, flush_seconds: float, batch_size: int):
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._pending: Dict[str, float] = {}
+        self._flusher = PeriodicTask("Session activity flush", self.flush, flush_seconds)
+
+        self.touches = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failures = 0
+
+    def touch(self, session_id: str) -> None:
+        self._pending[session_id] = time.time()
+        self.touches += 1
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+        try:
+            async with open_session() as db:
+                for start in range(0, len(items), self.batch_size):
+                    batch = items[start:start + self.batch_size]
+                    activity = values(
+                        column("id", UUID(as_uuid=False)),
+                        column("last_active_at", DateTime(timezone=True)),
+                        name="activity",
+                    ).data([
+                        (sid, datetime.fromtimestamp(ts, timezone.utc)) for sid, ts in batch
+                    ])
+                    await db.execute(
+                        update(SessionModel)
+                        .where(
+                            SessionModel.id == activity.c.id,
+                            SessionModel.last_active_at < activity.c.last_active_at,
+                        )
+                        .values(last_active_at=activity.c.last_active_at)
+                    )
+                await db.commit()
+        except Exception:
+            self.failures += 1
+            logger.exception("Flushing session activity failed, keeping %d entries", len(items))
+            # Put the batch back unless a newer touch arrived meanwhile
+            for sid, ts in items:
+                if self._pending.get(sid, 0) < ts:
+                    self._pending[sid] = ts
+            return
+        self.flushes += 1
+        self.rows_flushed += len(items)
+
+    def start(self) -> None:
+        self._flusher.start()
+
+    async def stop(self) -> None:
+        await self._flusher.stop()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "failures": self.failures,
+        }
+
+
+session_activity = SessionActivityTracker(
+    settings.SESSION_ACTIVITY_FLUSH_SECONDS, settings.SESSION_ACTIVITY_BATCH_SIZE
+)
+register_stats_source("session_activity", session_activity.stats)
@@ -0,0 +1,143 @@
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from fastapi import HTTPException, Request, status
+from sqlalchemy import Select, insert, select
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.metrics import register_stats_source
+from app.core.periodic import PeriodicTask
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+
+class AuditWriter:
+    """Bounded in-memory queue of audit events drained by a background writer.
+
+    ``record`` only appends to a deque, so handlers never wait on the
+    database. The writer inserts whole batches with one multi-row INSERT.
+    When the queue is full the configured policy drops either the incoming
+    event or the oldest queued one.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_seconds: float, drop_policy: str):
+        if drop_policy not in (DROP_NEWEST, DROP_OLDEST):
+            raise ValueError(f"Unknown audit drop policy: {drop_policy}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.drop_policy = drop_policy
+        self._queue: deque = deque()
+        self._flusher = PeriodicTask("Audit log flush", self.flush, flush_seconds)
+
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def record(
+        self,
+        action: str,
+        *,
+        user_id: Any = None,
+        request: Optional[Request] = None,
+        details: Optional[dict] = None,
+    ) -> None:
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            if self.drop_policy == DROP_NEWEST:
+                return
+            self._queue.popleft()
+        self._queue.append({
+            "user_id": user_id,
+            "action": action,
+            "ip_address": request.client.host if request is not None and request.client else None,
+            "user_agent": request.headers.get("user-agent") if request is not None else None,
+            "details": details,
+            "created_at": datetime.now(timezone.utc),
+        })
+        self.queued += 1
+        if len(self._queue) >= self.batch_size:
+            self._flusher.wake()
+
+    async def _write_batch(self) -> None:
+        batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        try:
+            async with open_session() as db:
+                await db.execute(insert(AuditLog).values(batch))
+                await db.commit()
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Writing %d audit events failed", len(batch))
+            return
+        self.written += len(batch)
+        self.batches += 1
+
+    async def flush(self) -> None:
+        while self._queue:
+            await self._write_batch()
+
+    def start(self) -> None:
+        self._flusher.start()
+
+    async def stop(self) -> None:
+        await self._flusher.stop()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._queue),
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+def audit_log_window(
+    since: Optional[datetime],
+    until: Optional[datetime],
+    default_days: int = 30,
+) -> tuple[datetime, datetime]:
+    """Resolve a query window, capped at AUDIT_QUERY_MAX_DAYS."""
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(days=min(default_days, settings.AUDIT_QUERY_MAX_DAYS))
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    if since >= until:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since must be before until")
+    if until - since > timedelta(days=settings.AUDIT_QUERY_MAX_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Audit log window is limited to {settings.AUDIT_QUERY_MAX_DAYS} days",
+        )
+    return since, until
+
+
+def select_audit_logs(since: datetime, until: datetime) -> Select:
+    # Always bounded on created_at so the planner prunes to the partitions
+    # of the requested months
+    return (
+        select(AuditLog)
+        .where(AuditLog.created_at >= since, AuditLog.created_at < until)
+        .order_by(AuditLog.created_at.desc())
+    )
+
+
+audit_log = AuditWriter(
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_seconds=settings.AUDIT_FLUSH_SECONDS,
+    drop_policy=settings.AUDIT_DROP_POLICY,
+)
+register_stats_source("audit_log", audit_log.stats)
@@ -0,0 +1,139 @@
+import logging
+import re
+import time
+from datetime import date, datetime, timezone
+from typing import List
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import advisory_lock, open_session
+from app.core.metrics import register_stats_source
+from app.core.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant shared by every worker and the CLI
+PARTITION_LOCK_KEY = 7312002
+
+_partition_name = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+
+_LIST_PARTITIONS = text("""
+    SELECT child.relname FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    JOIN pg_namespace ns ON ns.oid = parent.relnamespace
+    WHERE ns.nspname = 'auth' AND parent.relname = 'audit_logs'
+""")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class AuditPartitionManager:
+    """Keeps the monthly partitions of auth.audit_logs rolling.
+
+    Creates partitions AUDIT_PARTITIONS_AHEAD months in advance so inserts
+    never land in the default partition, and detaches and drops whole months
+    older than AUDIT_RETENTION_MONTHS instead of deleting rows. Runs
+    in-process every AUDIT_PARTITION_INTERVAL_SECONDS (one worker at a time,
+    guarded by an advisory lock) or once from ``manage_audit_partitions.py``.
+    """
+
+    def __init__(self, months_ahead: int, retention_months: int, interval_seconds: float):
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.interval_seconds = interval_seconds
+        # First pass right away so a fresh deployment has its partitions
+        self._runner = PeriodicTask(
+            "Audit partition maintenance", self.run_once, interval_seconds,
+            run_first=True, on_error=self._run_failed,
+        )
+
+        self.runs = 0
+        self.partitions_created = 0
+        self.partitions_dropped = 0
+        self.last_duration_seconds = 0.0
+        self.failures = 0
+
+    async def list_partitions(self) -> List[str]:
+        async with open_session() as db:
+            return list((await db.scalars(_LIST_PARTITIONS)).all())
+
+    async def _ensure(self, existing: set, this_month: date) -> List[str]:
+        created = []
+        for offset in range(self.months_ahead + 1):
+            month = add_months(this_month, offset)
+            name = f"audit_logs_{month:%Y_%m}"
+            if name in existing:
+                continue
+            async with open_session() as db:
+                await db.execute(text("SELECT auth.ensure_audit_log_partition(:month)"), {"month": month})
+                await db.commit()
+            created.append(name)
+        return created
+
+    async def _drop_expired(self, existing: set, this_month: date) -> List[str]:
+        # Retention 0 keeps everything; otherwise keep the current month plus
+        # the previous ``retention_months - 1`` in full
+        if self.retention_months <= 0:
+            return []
+        cutoff = add_months(this_month, -(self.retention_months - 1))
+        dropped = []
+        for name in sorted(existing):
+            match = _partition_name.match(name)
+            if match is None or date(int(match[1]), int(match[2]), 1) >= cutoff:
+                continue
+            async with open_session() as db:
+                await db.execute(text(f'ALTER TABLE auth.audit_logs DETACH PARTITION auth."{name}"'))
+                await db.execute(text(f'DROP TABLE auth."{name}"'))
+                await db.commit()
+            dropped.append(name)
+        return dropped
+
+    async def run_once(self) -> dict | None:
+        """One maintenance pass; returns None if another process holds the lock."""
+        async with advisory_lock(PARTITION_LOCK_KEY) as locked:
+            if not locked:
+                return None
+            start = time.perf_counter()
+            now = datetime.now(timezone.utc)
+            this_month = date(now.year, now.month, 1)
+            existing = set(await self.list_partitions())
+            created = await self._ensure(existing, this_month)
+            dropped = await self._drop_expired(existing, this_month)
+            duration = time.perf_counter() - start
+
+        self.runs += 1
+        self.partitions_created += len(created)
+        self.partitions_dropped += len(dropped)
+        self.last_duration_seconds = duration
+        report = {"created": created, "dropped": dropped, "duration_seconds": round(duration, 3)}
+        logger.info("Audit partition maintenance finished: %s", report)
+        return report
+
+    def _run_failed(self) -> None:
+        self.failures += 1
+
+    def start(self) -> None:
+        self._runner.start()
+
+    async def stop(self) -> None:
+        await self._runner.stop()
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "partitions_created": self.partitions_created,
+            "partitions_dropped": self.partitions_dropped,
+            "last_duration_seconds": self.last_duration_seconds,
+            "failures": self.failures,
+        }
+
+
+audit_partitions = AuditPartitionManager(
+    months_ahead=settings.AUDIT_PARTITIONS_AHEAD,
+    retention_months=settings.AUDIT_RETENTION_MONTHS,
+    interval_seconds=settings.AUDIT_PARTITION_INTERVAL_SECONDS,
+)
+register_stats_source("audit_partitions", audit_partitions.stats)
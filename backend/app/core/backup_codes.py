@@ -0,0 +1,61 @@
+import hashlib
+import hmac
+import secrets
+from typing import List
+from sqlalchemy import Text, bindparam, func, update
+from app.core.config import settings
+from app.core.security import SECRET_KEY
+from app.models.user_secret import UserSecret
+
+# No 0/1/i/l/o, so codes survive being read off paper
+_ALPHABET = "23456789abcdefghjkmnpqrstuvwxyz"
+_CODE_LENGTH = 10
+
+_KEY = hmac.new(
+    (settings.BACKUP_CODE_KEY or SECRET_KEY).encode(), b"arima-backup-codes", hashlib.sha256
+).digest()
+
+
+def normalize_backup_code(code: str) -> str:
+    return code.replace("-", "").replace(" ", "").lower()
+
+
+def is_backup_code(code: str) -> bool:
+    """Backup codes are distinguishable from 6-digit TOTP codes by shape alone."""
+    code = normalize_backup_code(code or "")
+    return len(code) == _CODE_LENGTH and all(char in _ALPHABET for char in code)
+
+
+def backup_code_digest(user_id, code: str) -> str:
+    # Keyed and bound to the user: a leaked table cannot be brute-forced
+    # offline, and a code only ever matches its own user's row
+    message = f"{user_id}:{normalize_backup_code(code)}".encode()
+    return hmac.new(_KEY, message, hashlib.sha256).hexdigest()
+
+
+def generate_backup_codes(user_id, count: int = settings.BACKUP_CODE_COUNT) -> tuple[List[str], List[str]]:
+    """Return ``(codes, digests)``: codes are shown once, only digests are stored."""
+    codes = []
+    for _ in range(count):
+        raw = "".join(secrets.choice(_ALPHABET) for _ in range(_CODE_LENGTH))
+        codes.append(f"{raw[:5]}-{raw[5:]}")
+    return codes, [backup_code_digest(user_id, code) for code in codes]
+
+
+async def redeem_backup_code(db, user_id, code: str) -> bool:
+    """Consume ``code`` if it is one of the user's unused codes.
+
+    One conditional UPDATE on the user's row both checks and removes the
+    digest, so two concurrent logins cannot redeem the same code.
+    """
+    digest = backup_code_digest(user_id, code)
+    result = await db.execute(
+        update(UserSecret)
+        .where(UserSecret.user_id == user_id, UserSecret.backup_codes.contains([digest]))
+        .values(
+            backup_codes=UserSecret.backup_codes.op("-")(bindparam("digest", digest, type_=Text)),
+            updated_at=func.now(),
+        )
+        .returning(UserSecret.user_id)
+    )
+    return result.first() is not None
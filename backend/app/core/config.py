@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     APP_NAME: str = "Arima Web Backend"
@@ -11,13 +11,139 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     POSTGRES_PORT: int = 5432
+    # Use the asyncpg engine for request handlers; set False to fall back to
+    # the psycopg2 engine driven from the threadpool.
+    DB_ASYNC: bool = True
+
+    # Connection pool, per engine and per worker process
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Server-side limit per statement (0 disables)
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    DB_APPLICATION_NAME: str = "arima-web-backend"
+    # Server-side prepared statements cached per asyncpg connection. Set 0
+    # behind PgBouncer in transaction pooling mode: statements are then
+    # prepared per execution under unique names and never reused.
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256
     
+    # Connections each worker opens at startup, before it accepts traffic
+    DB_POOL_WARMUP_CONNECTIONS: int = 2
+    # Spawn the hashing processes at startup instead of on the first login
+    HASH_POOL_WARMUP: bool = True
+
+    # serve.py (production launcher); workers default to the CPU count
+    WEB_HOST: str = "0.0.0.0"
+    WEB_WORKERS: Optional[int] = None
+    WEB_KEEPALIVE_SECONDS: int = 5
+    WEB_BACKLOG: int = 2048
+    WEB_LIMIT_CONCURRENCY: Optional[int] = None
+    WEB_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    WEB_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ADMIN_ROLES: List[str] = ["Superadmin", "admin"]
+
+    # Password hashing: the first scheme hashes new passwords, the others only
+    # verify and are upgraded on login. Tune the costs with calibrate_hashing.py.
+    PASSWORD_SCHEMES: List[str] = ["bcrypt"]
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KIB: int = 65536
+    ARGON2_PARALLELISM: int = 1
+    # Rehash stale hashes (old scheme or cost) after a successful login
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+
+    # Previous passwords a new one must differ from (0 only rejects the current one).
+    # A change costs up to DEPTH + 2 hash runs; the history checks go at most
+    # HASH_WORKERS at a time, so with one hashing worker they run in sequence.
+    PASSWORD_HISTORY_DEPTH: int = 5
+
+    # Password hashing pool ("process" or "thread"); workers default to CPU count
+    HASH_EXECUTOR: str = "process"
+    HASH_WORKERS: Optional[int] = None
+    HASH_QUEUE_SIZE: int = 64
+    HASH_QUEUE_TIMEOUT_SECONDS: float = 2.0
+
+    # Per-worker cache of users resolved from access tokens (0 disables)
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Batched write-behind of sessions.last_active_at
+    SESSION_ACTIVITY_FLUSH_SECONDS: float = 30
+    SESSION_ACTIVITY_BATCH_SIZE: int = 500
+
+    # Expired/revoked session cleanup (interval 0 disables the in-process run)
+    SESSION_REAPER_INTERVAL_SECONDS: float = 3600
+    SESSION_REAPER_BATCH_SIZE: int = 1000
+    SESSION_REAPER_PAUSE_SECONDS: float = 0.2
+
+    # Audit log pipeline; drop policy is "drop_newest" or "drop_oldest"
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 1.0
+    AUDIT_DROP_POLICY: str = "drop_newest"
+    # Monthly audit_logs partitions: created ahead, whole months dropped past
+    # retention (0 keeps everything); interval 0 disables the in-process run
+    AUDIT_PARTITIONS_AHEAD: int = 3
+    AUDIT_RETENTION_MONTHS: int = 12
+    AUDIT_PARTITION_INTERVAL_SECONDS: float = 86400
+    # Widest window a single audit log query may cover
+    AUDIT_QUERY_MAX_DAYS: int = 90
+
+    # Login brute-force protection per (ip, identifier)
+    LOGIN_MAX_FAILURES: int = 5
+    LOGIN_FAILURE_WINDOW_SECONDS: float = 900
+    LOGIN_LOCKOUT_SECONDS: float = 900
+    LOGIN_LIMITER_MAX_KEYS: int = 100000
+    LOGIN_ATTEMPTS_SYNC_SECONDS: float = 10
+
+    # TOTP: accepted time steps either side of now, per-worker decoded key cache
+    TOTP_VALID_WINDOW: int = 1
+    TOTP_KEY_CACHE_SIZE: int = 10000
+
+    # 2FA backup codes per generation; digests are keyed with BACKUP_CODE_KEY
+    # (falls back to the JWT signing key)
+    BACKUP_CODE_COUNT: int = 10
+    BACKUP_CODE_KEY: Optional[str] = None
+
+    # How long a browser may reuse the 2FA setup QR image without revalidating
+    TWO_FACTOR_QR_MAX_AGE_SECONDS: int = 300
+
+    # Bulk user import: rows per COPY batch, passwords per hashing job, and
+    # hashing jobs in flight (defaults to half the hashing workers)
+    USER_IMPORT_BATCH_SIZE: int = 1000
+    USER_IMPORT_HASH_CHUNK: int = 16
+    USER_IMPORT_HASH_PARALLELISM: Optional[int] = None
+    USER_IMPORT_MAX_ERRORS: int = 1000
+
+    # How often each worker republishes component stats for /metrics
+    METRICS_REFRESH_SECONDS: float = 5
+
+    # SQL profiler: on for every request, or per request via X-SQL-Profile (admins)
+    SQL_PROFILE_ENABLED: bool = False
+    SQL_PROFILE_SLOW_REQUEST_MS: float = 500
+    SQL_PROFILE_SAMPLE_RATE: float = 0.1
+    SQL_PROFILE_REPEAT_THRESHOLD: int = 3
     
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
+        return f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    @property
+    def POSTGRES_DSN(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    def is_admin_role(self, role: Optional[str]) -> bool:
+        # Stored roles are free text ("Admin" from the users page), so match case-insensitively
+        return role is not None and role.casefold() in {r.casefold() for r in self.ADMIN_ROLES}
+
     class Config:
         env_file = ".env"
         case_sensitive = True
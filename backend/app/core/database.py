@@ -1,10 +1,149 @@
-from sqlalchemy import create_engine
+import csv
+import io
+import time
+from typing import List, Sequence
+from uuid import uuid4
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.metrics import instrument_engine, register_stats_source
+from app.core.profiling import instrument_engine_profiling
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+class PoolStats:
+    """Checkout counters for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        return {
+            "size": pool.size() if pool else 0,
+            "checked_out": pool.checkedout() if pool else 0,
+            "overflow": max(pool.overflow(), 0) if pool else 0,
+            "checkouts": self.checkouts,
+            "overflow_checkouts": self.overflow_checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+def _instrumented_pool_class(pool_class, stats: PoolStats):
+    # Pool events fire after a connection is handed out, so the time spent
+    # waiting for a free slot is measured around _do_get instead
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                stats.timeouts += 1
+                raise
+            finally:
+                stats.record_wait(time.perf_counter() - start)
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+def _instrument(sync_engine, stats: PoolStats) -> None:
+    stats.pool = sync_engine.pool
+    instrument_engine(sync_engine)
+    instrument_engine_profiling(sync_engine)
+    register_stats_source(f"db_pool_{stats.name}", stats.snapshot)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checkouts += 1
+        # Pools get recreated on dispose(), track the live one
+        stats.pool = sync_engine.pool
+        if sync_engine.pool.overflow() > 0:
+            stats.overflow_checkouts += 1
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+
+
+_pool_options = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+pool_stats = {"sync": PoolStats("sync")}
+
+_sync_connect_args = {"application_name": settings.DB_APPLICATION_NAME}
+if settings.DB_STATEMENT_TIMEOUT_MS:
+    _sync_connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    poolclass=_instrumented_pool_class(QueuePool, pool_stats["sync"]),
+    connect_args=_sync_connect_args,
+    **_pool_options,
+)
+_instrument(engine, pool_stats["sync"])
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API routers. Sessions keep their state after commit
+# because lazy refreshes would need IO outside of an await.
+async_engine = None
+if settings.DB_ASYNC:
+    pool_stats["async"] = PoolStats("async")
+    _server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        _server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    _async_connect_args = {
+        "server_settings": _server_settings,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+    if not settings.DB_PREPARED_STATEMENT_CACHE_SIZE:
+        # PgBouncer in transaction mode: statements are still prepared, so
+        # they need names no other client connection can collide with, and
+        # asyncpg's own statement cache has to be off as well
+        _async_connect_args["statement_cache_size"] = 0
+        _async_connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    async_engine = create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+        poolclass=_instrumented_pool_class(AsyncAdaptedQueuePool, pool_stats["async"]),
+        connect_args=_async_connect_args,
+        **_pool_options,
+    )
+    _instrument(async_engine.sync_engine, pool_stats["async"])
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    if async_engine is not None else None
+)
+
+# Sync sessions handed to the routers when DB_ASYNC is off
+ThreadedSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -13,3 +152,147 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class ThreadedSession:
+    """Awaitable wrapper around a sync Session.
+
+    Exposes the subset of the AsyncSession API used by the routers and runs
+    each blocking call in the threadpool, so the same handler code works on
+    the psycopg2 engine when DB_ASYNC is disabled.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+@asynccontextmanager
+async def open_session():
+    """Open a session on whichever engine DB_ASYNC selects."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        session = ThreadedSession(ThreadedSessionLocal())
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_async_db():
+    async with open_session() as db:
+        yield db
+
+
+_TRY_ADVISORY_LOCK = text("SELECT pg_try_advisory_lock(:key)")
+_ADVISORY_UNLOCK = text("SELECT pg_advisory_unlock(:key)")
+
+
+@asynccontextmanager
+async def advisory_lock(key: int):
+    """Try a session-level advisory lock; yields whether it was taken.
+
+    The lock belongs to the server connection, so one connection is kept
+    checked out from the try-lock to the unlock. The lock transaction is
+    committed right away, so no snapshot stays open while the block runs. If
+    the unlock fails the connection is invalidated, and closing it releases
+    the lock, instead of the connection going back to the pool still
+    holding it.
+    """
+    if async_engine is not None:
+        async with async_engine.connect() as connection:
+            locked = await connection.scalar(_TRY_ADVISORY_LOCK, {"key": key})
+            await connection.commit()
+            try:
+                yield locked
+            finally:
+                if locked:
+                    try:
+                        await connection.execute(_ADVISORY_UNLOCK, {"key": key})
+                        await connection.commit()
+                    except Exception:
+                        await connection.invalidate()
+                        raise
+        return
+
+    connection = await run_in_threadpool(engine.connect)
+    try:
+        locked = await run_in_threadpool(connection.scalar, _TRY_ADVISORY_LOCK, {"key": key})
+        await run_in_threadpool(connection.commit)
+        try:
+            yield locked
+        finally:
+            if locked:
+                try:
+                    await run_in_threadpool(connection.execute, _ADVISORY_UNLOCK, {"key": key})
+                    await run_in_threadpool(connection.commit)
+                except Exception:
+                    await run_in_threadpool(connection.invalidate)
+                    raise
+    finally:
+        await run_in_threadpool(connection.close)
+
+
+def _copy_psycopg2(session, table: str, columns: Sequence[str], records: List[tuple]) -> None:
+    # CSV format: None becomes an unquoted empty field, which COPY reads as NULL
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(records)
+    buffer.seek(0)
+    dbapi_connection = session.connection().connection.driver_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+async def copy_records(db, table: str, columns: Sequence[str], records: List[tuple]) -> None:
+    """COPY ``records`` into ``table`` inside the session's current transaction."""
+    if isinstance(db, ThreadedSession):
+        await run_in_threadpool(_copy_psycopg2, db.sync_session, table, columns, records)
+        return
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table, records=records, columns=list(columns)
+    )
+
+
+async def dispose_engines():
+    if async_engine is not None:
+        await async_engine.dispose()
+    await run_in_threadpool(engine.dispose)
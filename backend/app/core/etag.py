@@ -0,0 +1,24 @@
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Clients may keep the response but have to revalidate before using it
+REVALIDATE = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    return 'W/"%s"' % "-".join(str(part) for part in parts)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against ``If-None-Match``, which is what RFC 9110 asks for on GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,148 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.metrics import register_stats_source
+
+
+class HashingExecutor:
+    """Bounded pool for password hashing work.
+
+    At most ``workers + queue_size`` jobs are handed to the pool at once;
+    further callers wait up to ``queue_timeout`` seconds for a slot and then
+    get a 503 instead of piling up behind the queue.
+    """
+
+    def __init__(self, kind: str, workers: int, queue_size: int, queue_timeout: float):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown hashing executor kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.waiting = 0
+        self.in_pool = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "HashingExecutor":
+        return cls(
+            kind=settings.HASH_EXECUTOR,
+            workers=settings.HASH_WORKERS or os.cpu_count() or 1,
+            queue_size=settings.HASH_QUEUE_SIZE,
+            queue_timeout=settings.HASH_QUEUE_TIMEOUT_SECONDS,
+        )
+
+    def _start(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn: forking a process that already runs an event loop and
+                # a threadpool is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hashing"
+                )
+            self._slots = asyncio.Semaphore(self.workers + self.queue_size)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        executor = self._start()
+
+        wait_start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self.waiting -= 1
+            self.wait_seconds_total += time.perf_counter() - wait_start
+
+        self.submitted += 1
+        self.in_pool += 1
+        loop = asyncio.get_running_loop()
+        slots = self._slots
+        start = time.perf_counter()
+        try:
+            job = executor.submit(fn, *args)
+        except Exception:
+            # e.g. a broken process pool: no job, so nothing will free the slot later
+            self.in_pool -= 1
+            self.failed += 1
+            slots.release()
+            raise
+
+        def _done(job) -> None:
+            try:
+                loop.call_soon_threadsafe(self._finish, slots, job, start)
+            except RuntimeError:
+                # Loop already closed at shutdown
+                pass
+
+        # The slot is freed when the pool is done with the job, not when the
+        # caller stops waiting: a started job cannot be cancelled and keeps
+        # its worker busy after its caller is gone
+        job.add_done_callback(_done)
+        return await asyncio.wrap_future(job)
+
+    def _finish(self, slots: asyncio.Semaphore, job, start: float) -> None:
+        self.in_pool -= 1
+        slots.release()
+        if job.cancelled():
+            return
+        elapsed = time.perf_counter() - start
+        self.hash_seconds_total += elapsed
+        self.hash_seconds_max = max(self.hash_seconds_max, elapsed)
+        if job.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queue_depth": self.waiting + max(self.in_pool - self.workers, 0),
+            "waiting": self.waiting,
+            "in_pool": self.in_pool,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_seconds_total,
+            "hash_seconds_total": self.hash_seconds_total,
+            "hash_seconds_max": self.hash_seconds_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+
+hashing_executor = HashingExecutor.from_settings()
+register_stats_source("hashing", hashing_executor.stats)
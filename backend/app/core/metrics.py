@@ -0,0 +1,191 @@
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from starlette.responses import Response
+from app.core.config import settings
+
+# With PROMETHEUS_MULTIPROC_DIR set, prometheus_client writes every sample to
+# per-process files and /metrics aggregates them across uvicorn workers
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=_LATENCY_BUCKETS,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum"
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements executed per request", ["method", "route"],
+    buckets=_COUNT_BUCKETS,
+)
+db_time_per_request_seconds = Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL statements per request", ["method", "route"],
+    buckets=_LATENCY_BUCKETS,
+)
+password_hash_seconds = Histogram(
+    "password_hash_seconds", "bcrypt hash/verify latency including pool wait", ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+totp_verify_seconds = Histogram(
+    "totp_verify_seconds", "TOTP verification latency",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05),
+)
+component_stat = Gauge(
+    "arima_component_stat", "Internal counters and gauges of in-process components",
+    ["component", "stat"], multiprocess_mode="livesum",
+)
+# Limits, maxima and timestamps mean nothing summed across workers
+component_stat_max = Gauge(
+    "arima_component_stat_max", "Non-additive stats of in-process components, max over workers",
+    ["component", "stat"], multiprocess_mode="livemax",
+)
+_NON_ADDITIVE_STATS = {"workers", "queue_size", "max_size", "max_queue"}
+
+
+class RequestDbStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set by the middleware for the duration of a request; engine hooks add to it
+request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(sync_engine) -> None:
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+
+_stats_sources: Dict[str, Callable[[], dict]] = {}
+
+def register_stats_source(component: str, source: Callable[[], dict]) -> None:
+    """Export the numeric values of ``source()`` as arima_component_stat gauges."""
+    _stats_sources[component] = source
+
+def _is_additive(stat: str) -> bool:
+    return not (
+        stat in _NON_ADDITIVE_STATS
+        or stat.startswith("last_")
+        or stat.endswith(("_max", "_at"))
+    )
+
+def refresh_component_metrics() -> None:
+    for component, source in _stats_sources.items():
+        for stat, value in source().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                gauge = component_stat if _is_additive(stat) else component_stat_max
+                gauge.labels(component, stat).set(value)
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route, e.g. ``/api/v1/sessions/{session_id}``.
+
+    Rebuilt from the path and its path params because ``scope["route"].path``
+    lacks the router prefix on some FastAPI versions.
+    """
+    if scope.get("endpoint") is None:
+        return "unmatched"
+    path_params = scope.get("path_params")
+    if not path_params:
+        return scope["path"]
+    names = {str(value): name for name, value in path_params.items()}
+    return "/".join(
+        "{%s}" % names[segment] if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route request metrics.
+
+    Routes are labelled with their path template so label cardinality stays
+    bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db_stats = RequestDbStats()
+        token = request_db_stats.set(db_stats)
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            request_db_stats.reset(token)
+            path = route_template(scope)
+            method = scope["method"]
+            http_requests_total.labels(method, path, str(status_code)).inc()
+            http_request_duration_seconds.labels(method, path).observe(elapsed)
+            db_queries_per_request.labels(method, path).observe(db_stats.queries)
+            db_time_per_request_seconds.labels(method, path).observe(db_stats.seconds)
+
+
+def render_metrics() -> Response:
+    refresh_component_metrics()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+async def run_metrics_refresher() -> None:
+    # Other workers only see this worker's component stats through its
+    # multiprocess files, so keep them fresh between scrapes
+    while True:
+        await asyncio.sleep(settings.METRICS_REFRESH_SECONDS)
+        refresh_component_metrics()
+
+
+def mark_process_dead() -> None:
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
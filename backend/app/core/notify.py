@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List
+import asyncpg
+from sqlalchemy import text
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Channels shared by the API workers and the admin scripts
+USER_CHANGED = "auth_user_changed"
+SESSION_REVOKED = "auth_session_revoked"
+TOTP_USED = "auth_totp_used"
+
+
+def notify_statement(channel: str, payload: str):
+    """NOTIFY as a statement, so it is delivered when the caller's transaction commits."""
+    return text("SELECT pg_notify(:channel, :payload)").bindparams(channel=channel, payload=payload)
+
+
+class NotificationListener:
+    """Holds one LISTEN connection per worker and dispatches payloads to handlers.
+
+    Notifications sent while the connection is down are lost, so reconnect
+    handlers run after every (re)connect to let subscribers resynchronise.
+    """
+
+    def __init__(self, dsn: str, retry_seconds: float = 2.0):
+        self.dsn = dsn
+        self.retry_seconds = retry_seconds
+        self._handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._reconnect_handlers: List[Callable[[], Awaitable[None]]] = []
+        self._task: asyncio.Task | None = None
+        self._connected = asyncio.Event()
+
+    def subscribe(self, channel: str, handler: Callable[[str], None]) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_reconnect(self, handler: Callable[[], Awaitable[None]]) -> None:
+        self._reconnect_handlers.append(handler)
+
+    def _dispatch(self, connection, pid, channel, payload) -> None:
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Notification handler for %s failed", channel)
+
+    async def _run(self) -> None:
+        first = True
+        while True:
+            closed = asyncio.Event()
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                connection.add_termination_listener(lambda _conn: closed.set())
+                for channel in self._handlers:
+                    await connection.add_listener(channel, self._dispatch)
+                if not first:
+                    for handler in self._reconnect_handlers:
+                        await handler()
+                first = False
+                self._connected.set()
+                await closed.wait()
+                logger.warning("LISTEN connection lost, reconnecting")
+            except asyncio.CancelledError:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+                raise
+            except Exception:
+                logger.exception("LISTEN connection failed, retrying in %ss", self.retry_seconds)
+            finally:
+                self._connected.clear()
+            await asyncio.sleep(self.retry_seconds)
+
+    async def start(self, timeout: float = 5.0) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            try:
+                await asyncio.wait_for(self._connected.wait(), timeout)
+            except asyncio.TimeoutError:
+                # Keep serving; the task keeps retrying in the background
+                logger.warning("LISTEN connection not ready after %ss", timeout)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+listener = NotificationListener(settings.POSTGRES_DSN)
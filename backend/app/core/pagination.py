@@ -0,0 +1,24 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def like_pattern(term: str) -> str:
+    """Substring pattern for ILIKE with the wildcards in ``term`` escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Background task awaiting ``job`` every ``interval_seconds``.
+
+    A failed run is logged and reported to ``on_error``; the loop carries on.
+    ``wake()`` starts the next run early, ``run_first`` runs once right after
+    ``start()`` instead of one interval later. A non-positive interval
+    disables the task.
+    """
+
+    def __init__(self, name: str, job: Callable[[], Awaitable[object]], interval_seconds: float,
+                 run_first: bool = False, on_error: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self.run_first = run_first
+        self.on_error = on_error
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def _wait(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _run(self) -> None:
+        if not self.run_first:
+            await self._wait()
+        while True:
+            try:
+                await self.job()
+            except Exception:
+                if self.on_error is not None:
+                    self.on_error()
+                logger.exception("%s failed", self.name)
+            await self._wait()
+
+    def start(self) -> None:
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the loop, waiting for a run in progress to unwind."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
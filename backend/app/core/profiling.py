@@ -0,0 +1,166 @@
+import json
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql_profile")
+
+PROFILE_HEADER = "x-sql-profile"
+
+_placeholder = re.compile(r"\$\d+|%\([^)]+\)s|%s")
+_placeholder_list = re.compile(r"\(\?(?:,\s*\?)+\)")
+_whitespace = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    # Same query with a different number of IN-list items is the same shape
+    shape = _placeholder.sub("?", statement)
+    shape = _placeholder_list.sub("(?, ...)", shape)
+    return _whitespace.sub(" ", shape).strip()
+
+
+class _ShapeStats:
+    __slots__ = ("count", "seconds", "max_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+
+class RequestProfile:
+    """Every SQL statement of one request, grouped by statement shape."""
+
+    def __init__(self, requested: bool):
+        self.requested = requested
+        self.authorized = False
+        self.queries = 0
+        self.seconds = 0.0
+        self.shapes: Dict[str, _ShapeStats] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.seconds += seconds
+        stats = self.shapes.get(statement)
+        if stats is None:
+            stats = self.shapes[statement] = _ShapeStats()
+        stats.count += 1
+        stats.seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def breakdown(self) -> List[dict]:
+        # Raw statements are keyed first and only normalised here, off the hot path
+        merged: Dict[str, dict] = {}
+        for statement, stats in self.shapes.items():
+            entry = merged.setdefault(statement_shape(statement), {"count": 0, "ms": 0.0, "max_ms": 0.0})
+            entry["count"] += stats.count
+            entry["ms"] += stats.seconds * 1000
+            entry["max_ms"] = max(entry["max_ms"], stats.max_seconds * 1000)
+        return sorted(
+            ({"sql": sql, **entry} for sql, entry in merged.items()),
+            key=lambda item: item["ms"],
+            reverse=True,
+        )
+
+    def repeated(self, breakdown: List[dict]) -> List[dict]:
+        return [item for item in breakdown if item["count"] >= settings.SQL_PROFILE_REPEAT_THRESHOLD]
+
+
+request_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def instrument_engine_profiling(sync_engine) -> None:
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if request_profile.get() is not None:
+            conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = request_profile.get()
+        if profile is not None:
+            profile.record(statement, time.perf_counter() - conn.info["profile_start"].pop())
+
+
+def mark_profile_user(user) -> None:
+    """Called once the user is known; only admins may see header-requested profiles."""
+    profile = request_profile.get()
+    if profile is not None:
+        profile.authorized = settings.is_admin_role(user.role)
+
+
+class SqlProfilerMiddleware:
+    """Opt-in per-request SQL profiler.
+
+    Active for every request when SQL_PROFILE_ENABLED is set, or for a single
+    request carrying ``X-SQL-Profile: 1`` from an admin. Slow requests and
+    requests with repeated statement shapes (likely N+1 loads) are sampled
+    into the ``app.sql_profile`` log with their query breakdown; admin header
+    requests also get a summary in the ``X-SQL-Profile`` response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = any(
+            name == PROFILE_HEADER.encode() and value.strip() not in (b"", b"0")
+            for name, value in scope["headers"]
+        )
+        if not (requested or settings.SQL_PROFILE_ENABLED):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(requested)
+        token = request_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and profile.requested and profile.authorized:
+                repeated = profile.repeated(profile.breakdown())
+                summary = f"queries={profile.queries}; time_ms={profile.seconds * 1000:.1f}; repeated={len(repeated)}"
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-sql-profile", summary.encode()),
+                    (b"server-timing", f"db;dur={profile.seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_profile.reset(token)
+            self._report(scope, profile, time.perf_counter() - start)
+
+    def _report(self, scope, profile: RequestProfile, elapsed: float) -> None:
+        if profile.queries == 0:
+            return
+        breakdown = profile.breakdown()
+        repeated = profile.repeated(breakdown)
+        slow = elapsed * 1000 >= settings.SQL_PROFILE_SLOW_REQUEST_MS
+        explicit = profile.requested and profile.authorized
+        if not explicit:
+            # A non-admin sending the header gets nothing beyond the global setting
+            if not settings.SQL_PROFILE_ENABLED or not (slow or repeated):
+                return
+            if random.random() >= settings.SQL_PROFILE_SAMPLE_RATE:
+                return
+        logger.info(json.dumps({
+            "event": "sql_profile",
+            "method": scope["method"],
+            "path": scope["path"],
+            "duration_ms": round(elapsed * 1000, 2),
+            "queries": profile.queries,
+            "db_ms": round(profile.seconds * 1000, 2),
+            "slow": slow,
+            "repeated_shapes": [item["sql"] for item in repeated],
+            "statements": breakdown,
+        }, default=str))
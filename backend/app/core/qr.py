@@ -0,0 +1,38 @@
+import hashlib
+import hmac
+import io
+import qrcode
+import qrcode.image.svg
+from starlette.concurrency import run_in_threadpool
+from app.core.security import SECRET_KEY
+
+MEDIA_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+
+
+def render_qr(data: str, fmt: str = "svg") -> bytes:
+    """Render ``data`` as a QR code image.
+
+    SVG is built in pure Python. PNG uses qrcode's default image factory
+    (Pillow when installed, PyPNG otherwise) and is only imported on demand.
+    """
+    qr = qrcode.QRCode(border=2)
+    qr.add_data(data)
+    qr.make(fit=True)
+    if fmt == "svg":
+        image = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+    elif fmt == "png":
+        image = qr.make_image()
+    else:
+        raise ValueError(f"Unknown QR format: {fmt}")
+    buffer = io.BytesIO()
+    image.save(buffer)
+    return buffer.getvalue()
+
+
+async def render_qr_async(data: str, fmt: str = "svg") -> bytes:
+    return await run_in_threadpool(render_qr, data, fmt)
+
+
+def secret_fingerprint(secret: str) -> str:
+    # Identifies the pending secret in ETags without revealing it
+    return hmac.new(SECRET_KEY.encode(), secret.encode(), hashlib.sha256).hexdigest()[:32]
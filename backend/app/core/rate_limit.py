@@ -0,0 +1,232 @@
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.metrics import register_stats_source
+from app.core.periodic import PeriodicTask
+from app.models.login_attempt import LoginAttempt
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str]
+
+# Rows per upsert/delete statement, well below the 32767 bind parameter limit
+_SYNC_BATCH_SIZE = 500
+
+
+class _Entry:
+    __slots__ = ("failures", "locked_until")
+
+    def __init__(self):
+        self.failures: deque = deque()
+        self.locked_until = 0.0
+
+
+class LoginRateLimiter:
+    """Sliding-window failure counter per (ip, identifier), checked before bcrypt.
+
+    State lives in memory; a background task periodically upserts changed
+    keys into auth.login_attempts and pulls back locks written by other
+    workers, so locks survive restarts and apply across workers within one
+    sync interval.
+
+    Only failure windows are LRU-bounded by ``max_keys``. A key that gets
+    locked moves out of the LRU and is kept until the lock expires, so a
+    spray of cheap failures on other keys cannot evict it.
+    """
+
+    def __init__(self, max_failures: int, window_seconds: float, lockout_seconds: float,
+                 max_keys: int, sync_seconds: float):
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self.lockout_seconds = lockout_seconds
+        self.max_keys = max_keys
+        self.sync_seconds = sync_seconds
+        self._entries: "OrderedDict[Key, _Entry]" = OrderedDict()
+        self._locked: Dict[Key, _Entry] = {}
+        self._dirty: Set[Key] = set()
+        # Dirty keys whose row a successful login cleared; evicted keys keep theirs
+        self._cleared: Set[Key] = set()
+        self._syncer = PeriodicTask("Syncing login locks", self.sync, sync_seconds, on_error=self._sync_failed)
+
+        self.rejected = 0
+        self.failures_recorded = 0
+        self.locks = 0
+        self.evictions = 0
+        self.sync_failures = 0
+
+    @staticmethod
+    def _key(ip: Optional[str], identifier: str) -> Key:
+        # Cut to the login_attempts column widths so no key can fail a sync
+        return ((ip or "unknown")[:45], identifier.strip().lower()[:255])
+
+    def check(self, ip: Optional[str], identifier: str) -> None:
+        entry = self._locked.get(self._key(ip, identifier))
+        if entry is None:
+            return
+        remaining = entry.locked_until - time.time()
+        if remaining > 0:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts, try again later",
+                headers={"Retry-After": str(math.ceil(remaining))},
+            )
+
+    def record_failure(self, ip: Optional[str], identifier: str) -> None:
+        key = self._key(ip, identifier)
+        now = time.time()
+        # An expired lock starts over with an empty window
+        self._locked.pop(key, None)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._entries.move_to_end(key)
+        entry.failures.append(now)
+        while entry.failures and entry.failures[0] <= now - self.window_seconds:
+            entry.failures.popleft()
+        if len(entry.failures) >= self.max_failures:
+            entry.locked_until = now + self.lockout_seconds
+            entry.failures.clear()
+            self._locked[key] = self._entries.pop(key)
+            self.locks += 1
+        self._cleared.discard(key)
+        self._dirty.add(key)
+        self.failures_recorded += 1
+
+    def record_success(self, ip: Optional[str], identifier: str) -> None:
+        key = self._key(ip, identifier)
+        if self._entries.pop(key, None) is not None or self._locked.pop(key, None) is not None:
+            self._cleared.add(key)
+            self._dirty.add(key)
+
+    async def load(self) -> None:
+        async with open_session() as db:
+            rows = (await db.execute(
+                select(LoginAttempt.ip_address, LoginAttempt.email, LoginAttempt.locked_until).where(
+                    LoginAttempt.is_locked == True,
+                    LoginAttempt.locked_until > func.now(),
+                )
+            )).all()
+        for ip, identifier, locked_until in rows:
+            key = (ip, identifier)
+            entry = self._locked.get(key)
+            if entry is None:
+                # Any failure window here is superseded by the lock
+                entry = self._locked[key] = self._entries.pop(key, None) or _Entry()
+                entry.failures.clear()
+            entry.locked_until = max(entry.locked_until, locked_until.timestamp())
+
+    def prune(self) -> None:
+        now = time.time()
+        for key in [key for key, entry in self._locked.items() if entry.locked_until <= now and key not in self._dirty]:
+            del self._locked[key]
+        stale = [
+            key for key, entry in self._entries.items()
+            if (not entry.failures or entry.failures[-1] <= now - self.window_seconds)
+            and key not in self._dirty
+        ]
+        for key in stale:
+            del self._entries[key]
+
+    async def sync(self) -> None:
+        self.prune()
+        dirty, self._dirty = self._dirty, set()
+        cleared_keys, self._cleared = self._cleared, set()
+        upserts, cleared = [], []
+        for key in dirty:
+            entry = self._locked.get(key) or self._entries.get(key)
+            if entry is None:
+                # Evicted from the LRU: its row stays, only a login clears it
+                if key in cleared_keys:
+                    cleared.append(key)
+                continue
+            locked = entry.locked_until > time.time()
+            last_attempt = entry.failures[-1] if entry.failures else time.time()
+            upserts.append({
+                "ip_address": key[0],
+                "email": key[1],
+                "attempt_count": len(entry.failures),
+                "last_attempt_at": datetime.fromtimestamp(last_attempt, timezone.utc),
+                "is_locked": locked,
+                "locked_until": datetime.fromtimestamp(entry.locked_until, timezone.utc) if locked else None,
+            })
+
+        # Each batch commits on its own, a failing one only requeues its keys
+        failed: Set[Key] = set()
+        for start in range(0, len(upserts), _SYNC_BATCH_SIZE):
+            batch = upserts[start:start + _SYNC_BATCH_SIZE]
+            stmt = insert(LoginAttempt).values(batch)
+            if not await self._persist(stmt.on_conflict_do_update(
+                index_elements=[LoginAttempt.ip_address, LoginAttempt.email],
+                set_={
+                    "attempt_count": stmt.excluded.attempt_count,
+                    "last_attempt_at": stmt.excluded.last_attempt_at,
+                    "is_locked": stmt.excluded.is_locked,
+                    "locked_until": stmt.excluded.locked_until,
+                },
+            )):
+                failed.update((row["ip_address"], row["email"]) for row in batch)
+        for start in range(0, len(cleared), _SYNC_BATCH_SIZE):
+            batch = cleared[start:start + _SYNC_BATCH_SIZE]
+            if not await self._persist(delete(LoginAttempt).where(
+                tuple_(LoginAttempt.ip_address, LoginAttempt.email).in_(batch)
+            )):
+                failed.update(batch)
+                self._cleared.update(key for key in batch if key not in self._dirty)
+        self._dirty |= failed
+        await self.load()
+
+    async def _persist(self, statement) -> bool:
+        try:
+            async with open_session() as db:
+                await db.execute(statement)
+                await db.commit()
+        except Exception:
+            self.sync_failures += 1
+            logger.exception("Persisting login attempts failed")
+            return False
+        return True
+
+    def _sync_failed(self) -> None:
+        self.sync_failures += 1
+
+    def start(self) -> None:
+        self._syncer.start()
+
+    async def stop(self) -> None:
+        await self._syncer.stop()
+        await self.sync()
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._entries),
+            "locked_keys": len(self._locked),
+            "pending_sync": len(self._dirty),
+            "rejected": self.rejected,
+            "failures_recorded": self.failures_recorded,
+            "locks": self.locks,
+            "evictions": self.evictions,
+            "sync_failures": self.sync_failures,
+        }
+
+
+login_limiter = LoginRateLimiter(
+    max_failures=settings.LOGIN_MAX_FAILURES,
+    window_seconds=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+    lockout_seconds=settings.LOGIN_LOCKOUT_SECONDS,
+    max_keys=settings.LOGIN_LIMITER_MAX_KEYS,
+    sync_seconds=settings.LOGIN_ATTEMPTS_SYNC_SECONDS,
+)
+register_stats_source("login_limiter", login_limiter.stats)
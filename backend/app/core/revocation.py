@@ -0,0 +1,101 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict
+from sqlalchemy import select, func
+from app.core.database import open_session
+from app.core.metrics import register_stats_source
+from app.core.notify import SESSION_REVOKED, listener, notify_statement
+from app.core.user_cache import publish_sessions_changed
+from app.models.session import Session as SessionModel
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationIndex:
+    """In-memory set of revoked session IDs, each kept until the session's expires_at.
+
+    Warmed from auth.sessions at startup and after every LISTEN reconnect,
+    and kept current through SESSION_REVOKED notifications, so
+    get_current_user can reject a revoked ``sid`` without a query.
+    """
+
+    PURGE_EVERY = 1024
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._adds_since_purge = 0
+        self.rejections = 0
+        self.warmed_at: float | None = None
+
+    def add(self, session_id: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        self._revoked[session_id] = expires_at
+        self._adds_since_purge += 1
+        if self._adds_since_purge >= self.PURGE_EVERY:
+            self.purge()
+
+    def is_revoked(self, session_id: str) -> bool:
+        expires_at = self._revoked.get(session_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            self._revoked.pop(session_id, None)
+            return False
+        self.rejections += 1
+        return True
+
+    def purge(self) -> int:
+        now = time.time()
+        expired = [sid for sid, expires_at in self._revoked.items() if expires_at <= now]
+        for sid in expired:
+            del self._revoked[sid]
+        self._adds_since_purge = 0
+        return len(expired)
+
+    async def warm(self) -> None:
+        async with open_session() as db:
+            rows = (await db.execute(
+                select(SessionModel.id, SessionModel.expires_at).where(
+                    SessionModel.is_revoked == True,
+                    SessionModel.expires_at > func.now(),
+                )
+            )).all()
+        # Merge rather than replace: revocations are permanent, and entries added
+        # by notifications while the query ran must survive
+        self._revoked.update((str(sid), expires_at.timestamp()) for sid, expires_at in rows)
+        self.purge()
+        self.warmed_at = time.time()
+        logger.info("Revocation index warmed with %d sessions", len(self._revoked))
+
+    def handle_notification(self, payload: str) -> None:
+        session_id, _, expires_at = payload.partition(":")
+        self.add(session_id, float(expires_at))
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._revoked),
+            "rejections": self.rejections,
+            "warmed_at": self.warmed_at,
+        }
+
+
+async def publish_session_revoked(db, session_id, expires_at: datetime) -> None:
+    """Mark a session revoked in this worker and, once ``db`` commits, in every other worker."""
+    revocation_index.add(str(session_id), expires_at.timestamp())
+    await db.execute(notify_statement(SESSION_REVOKED, f"{session_id}:{expires_at.timestamp()}"))
+
+
+async def mark_session_revoked(db, session: SessionModel) -> None:
+    session.is_revoked = True
+    session.revoked_at = datetime.now(timezone.utc)
+    await publish_session_revoked(db, session.id, session.expires_at)
+    await publish_sessions_changed(db, [session.user_id])
+
+
+revocation_index = RevocationIndex()
+register_stats_source("revocation_index", revocation_index.stats)
+
+listener.subscribe(SESSION_REVOKED, revocation_index.handle_notification)
+listener.on_reconnect(revocation_index.warm)
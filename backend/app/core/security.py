@@ -1,10 +1,35 @@
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, Any
+import hashlib
+import os
+import secrets
+import time
+from typing import List, Optional, Any
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.hashing import hashing_executor
+from app.core.metrics import password_hash_seconds
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_password_context(
+    schemes: Optional[List[str]] = None,
+    bcrypt_rounds: Optional[int] = None,
+    argon2_time_cost: Optional[int] = None,
+    argon2_memory_cost_kib: Optional[int] = None,
+    argon2_parallelism: Optional[int] = None,
+) -> CryptContext:
+    schemes = schemes or settings.PASSWORD_SCHEMES
+    options: dict = {"schemes": schemes, "deprecated": "auto"}
+    if "bcrypt" in schemes:
+        options["bcrypt__rounds"] = bcrypt_rounds or settings.BCRYPT_ROUNDS
+    if "argon2" in schemes:
+        options["argon2__time_cost"] = argon2_time_cost or settings.ARGON2_TIME_COST
+        options["argon2__memory_cost"] = argon2_memory_cost_kib or settings.ARGON2_MEMORY_COST_KIB
+        options["argon2__parallelism"] = argon2_parallelism or settings.ARGON2_PARALLELISM
+    return CryptContext(**options)
+
+# Pool workers import this module too and build the same context from settings
+pwd_context = build_password_context()
 
 ALGORITHM = "HS256"
 # In production, this should be a secret key from env
@@ -23,8 +48,96 @@ def create_access_token(subject: str | Any, expires_delta: Optional[timedelta] =
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def create_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are random 256-bit values, a plain digest is enough to
+    # keep them unusable if the sessions table leaks
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+# bcrypt runs in the hashing pool; these two must stay importable module-level
+# functions so the process pool can pickle them
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+def _verify_or_false(plain_password: str, hashed_password: str) -> bool:
+    # Old rows may hold hashes passlib cannot read (UnknownHashError is a
+    # ValueError); they just never match instead of failing the whole check
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except ValueError:
+        return False
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def _hash_many(passwords: List[str]) -> List[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash uses a deprecated scheme or a different cost than configured."""
+    return pwd_context.needs_update(hashed_password)
+
+def warm_up_worker() -> int:
+    # Submitted once per pool worker at startup; unpickling it imports this
+    # module, and with it passlib and bcrypt, in the worker
+    time.sleep(0.05)
+    return os.getpid()
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    with password_hash_seconds.labels("verify").time():
+        return await hashing_executor.run(_verify, plain_password, hashed_password)
+
+async def verify_password_any(plain_password: str, hashed_passwords: List[str]) -> bool:
+    """True if the password matches any of the hashes; unreadable hashes never match.
+
+    At most one verification per pool worker is in flight, so a long history
+    does not fill the queue ahead of logins. With a single hashing worker
+    (serve.py gives each web worker its share of the CPUs) the hashes are
+    therefore checked one after another. Returns at the first match and
+    cancels the rest; a cancelled job that has not started frees its slot.
+    """
+    remaining = iter(hashed_passwords)
+    pending: set = set()
+
+    def submit() -> None:
+        for hashed in remaining:
+            pending.add(asyncio.ensure_future(hashing_executor.run(_verify_or_false, plain_password, hashed)))
+            if len(pending) >= hashing_executor.workers:
+                return
+
+    try:
+        with password_hash_seconds.labels("verify").time():
+            submit()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result():
+                        return True
+                submit()
+        return False
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def get_password_hash(password: str) -> str:
+    with password_hash_seconds.labels("hash").time():
+        return await hashing_executor.run(_hash, password)
+
+async def hash_passwords(passwords: List[str], chunk_size: int, parallelism: int) -> List[str]:
+    """Hash many passwords with at most ``parallelism`` pool jobs of ``chunk_size`` each.
+
+    Bulk work goes in chunks so it does not hold more pool slots than it is
+    allowed to, leaving the rest to interactive logins.
+    """
+    slots = asyncio.Semaphore(parallelism)
+
+    async def run(chunk: List[str]) -> List[str]:
+        async with slots:
+            with password_hash_seconds.labels("hash_bulk").time():
+                return await hashing_executor.run(_hash_many, chunk)
+
+    chunks = [passwords[start:start + chunk_size] for start in range(0, len(passwords), chunk_size)]
+    results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
@@ -0,0 +1,24 @@
+from typing import Any, Mapping, Optional, Type, TypeVar
+from pydantic import BaseModel
+from starlette.responses import Response
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def construct(model: Type[ModelT], source: Any, **values: Any) -> ModelT:
+    """Build ``model`` from the attributes of a trusted row or ORM object without validating.
+
+    Only for data that comes straight from our own columns; anything from a
+    client still goes through normal validation.
+    """
+    fields = {name: getattr(source, name) for name in model.model_fields if name not in values}
+    return model.model_construct(**fields, **values)
+
+
+def json_response(content: bytes, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Wrap JSON bytes from ``TypeAdapter.dump_json``.
+
+    Returning a Response skips FastAPI's response_model validation and
+    encoding; response_model stays on the route for the OpenAPI schema.
+    """
+    return Response(content, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import advisory_lock, open_session
+from app.core.metrics import register_stats_source
+from app.core.periodic import PeriodicTask
+from app.core.user_cache import publish_sessions_changed
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant shared by every worker and the CLI
+REAPER_LOCK_KEY = 7312001
+
+_MIN_ID = UUID(int=0)
+_MIN_TS = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Each batch is its own short transaction. SKIP LOCKED leaves rows that a
+# request is touching for the next run instead of waiting on them.
+_DELETE_EXPIRED = text("""
+    WITH batch AS (
+        SELECT id, expires_at AS cursor_ts FROM auth.sessions
+        WHERE expires_at < CURRENT_TIMESTAMP
+          AND (expires_at, id) > (CAST(:after_ts AS TIMESTAMPTZ), CAST(:after_id AS UUID))
+        ORDER BY expires_at, id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    DELETE FROM auth.sessions s USING batch
+    WHERE s.id = batch.id
+    RETURNING batch.cursor_ts, batch.id, s.user_id
+""")
+
+# Revoked rows stay until no access token for them can still be valid, so the
+# revocation index warm-up never misses a session that matters
+_DELETE_REVOKED = text("""
+    WITH batch AS (
+        SELECT id, revoked_at AS cursor_ts FROM auth.sessions
+        WHERE is_revoked
+          AND revoked_at < :revoked_before
+          AND (revoked_at, id) > (CAST(:after_ts AS TIMESTAMPTZ), CAST(:after_id AS UUID))
+        ORDER BY revoked_at, id
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    DELETE FROM auth.sessions s USING batch
+    WHERE s.id = batch.id
+    RETURNING batch.cursor_ts, batch.id
+""")
+
+
+class SessionReaper:
+    """Deletes expired and long-revoked sessions in small keyset-ordered batches.
+
+    Runs in-process every SESSION_REAPER_INTERVAL_SECONDS (one worker at a
+    time, guarded by an advisory lock) or once from ``reap_sessions.py``.
+    """
+
+    def __init__(self, batch_size: int, pause_seconds: float, interval_seconds: float):
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.interval_seconds = interval_seconds
+        self._runner = PeriodicTask("Session reaper run", self.run_once, interval_seconds, on_error=self._run_failed)
+
+        self.runs = 0
+        self.rows_deleted_total = 0
+        self.last_rows_deleted = 0
+        self.last_duration_seconds = 0.0
+        self.failures = 0
+
+    async def _reap(self, statement, bump_versions: bool = False, **params) -> tuple[int, int]:
+        after_ts, after_id = _MIN_TS, _MIN_ID
+        deleted = batches = 0
+        while True:
+            async with open_session() as db:
+                rows = (await db.execute(statement, {
+                    **params,
+                    "after_ts": after_ts,
+                    "after_id": after_id,
+                    "batch_size": self.batch_size,
+                })).all()
+                if bump_versions:
+                    # Expired sessions are still listed until they are deleted
+                    await publish_sessions_changed(db, {row.user_id for row in rows})
+                await db.commit()
+            if not rows:
+                return deleted, batches
+            deleted += len(rows)
+            batches += 1
+            after_ts, after_id = max((row.cursor_ts, row.id) for row in rows)
+            if len(rows) < self.batch_size:
+                return deleted, batches
+            await asyncio.sleep(self.pause_seconds)
+
+    async def run_once(self) -> dict | None:
+        """Reap one full pass; returns None if another process holds the lock."""
+        async with advisory_lock(REAPER_LOCK_KEY) as locked:
+            if not locked:
+                return None
+            start = time.perf_counter()
+            expired, expired_batches = await self._reap(_DELETE_EXPIRED, bump_versions=True)
+            revoked, revoked_batches = await self._reap(
+                _DELETE_REVOKED,
+                revoked_before=datetime.now(timezone.utc)
+                - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            )
+            duration = time.perf_counter() - start
+
+        self.runs += 1
+        self.last_rows_deleted = expired + revoked
+        self.rows_deleted_total += expired + revoked
+        self.last_duration_seconds = duration
+        report = {
+            "expired_deleted": expired,
+            "revoked_deleted": revoked,
+            "batches": expired_batches + revoked_batches,
+            "duration_seconds": round(duration, 3),
+        }
+        logger.info("Session reaper finished: %s", report)
+        return report
+
+    def _run_failed(self) -> None:
+        self.failures += 1
+
+    def start(self) -> None:
+        self._runner.start()
+
+    async def stop(self) -> None:
+        await self._runner.stop()
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "rows_deleted_total": self.rows_deleted_total,
+            "last_rows_deleted": self.last_rows_deleted,
+            "last_duration_seconds": self.last_duration_seconds,
+            "failures": self.failures,
+        }
+
+
+session_reaper = SessionReaper(
+    batch_size=settings.SESSION_REAPER_BATCH_SIZE,
+    pause_seconds=settings.SESSION_REAPER_PAUSE_SECONDS,
+    interval_seconds=settings.SESSION_REAPER_INTERVAL_SECONDS,
+)
+register_stats_source("session_reaper", session_reaper.stats)
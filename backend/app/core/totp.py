@@ -0,0 +1,137 @@
+import base64
+import hashlib
+import hmac
+import struct
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import register_stats_source
+from app.core.notify import TOTP_USED, listener, notify_statement
+
+
+def _decode_secret(secret: str) -> bytes:
+    secret = secret.replace(" ", "").upper()
+    return base64.b32decode(secret + "=" * (-len(secret) % 8))
+
+
+def totp_code(key: bytes, step: int, digits: int = 6) -> str:
+    """RFC 6238 code (HMAC-SHA1, dynamic truncation) for one time step."""
+    digest = hmac.new(key, struct.pack(">Q", step), hashlib.sha1).digest()
+    offset = digest[-1] & 0x0F
+    value = struct.unpack(">I", digest[offset:offset + 4])[0] & 0x7FFFFFFF
+    return str(value % 10 ** digits).zfill(digits)
+
+
+class TotpVerifier:
+    """TOTP checks without per-call pyotp objects, and with replay protection.
+
+    Decoded key bytes are cached per user next to the secret they came from,
+    so a changed secret is never verified against a stale key. Every accepted
+    (user, time step) pair is remembered until the step leaves the
+    verification window; other workers learn about it through TOTP_USED
+    notifications, so a code is accepted at most once.
+    """
+
+    PURGE_EVERY = 1024
+
+    def __init__(self, valid_window: int, key_cache_size: int, interval: int = 30, digits: int = 6):
+        self.valid_window = valid_window
+        self.key_cache_size = key_cache_size
+        self.interval = interval
+        self.digits = digits
+        self._keys: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._used: Dict[Tuple[str, int], float] = {}
+        self._adds_since_purge = 0
+
+        self.verified = 0
+        self.rejected = 0
+        self.replays = 0
+        self.key_hits = 0
+        self.key_misses = 0
+
+    def _key(self, user_id: str, secret: str) -> bytes:
+        cached = self._keys.get(user_id)
+        if cached is not None and cached[0] == secret:
+            self._keys.move_to_end(user_id)
+            self.key_hits += 1
+            return cached[1]
+        self.key_misses += 1
+        key = _decode_secret(secret)
+        self._keys[user_id] = (secret, key)
+        self._keys.move_to_end(user_id)
+        if len(self._keys) > self.key_cache_size:
+            self._keys.popitem(last=False)
+        return key
+
+    def invalidate(self, user_id) -> None:
+        self._keys.pop(str(user_id), None)
+
+    def mark_used(self, user_id: str, step: int) -> None:
+        # A step can be presented until it falls out of the window
+        expires_at = (step + self.valid_window + 1) * self.interval
+        if expires_at <= time.time():
+            return
+        self._used[(user_id, step)] = expires_at
+        self._adds_since_purge += 1
+        if self._adds_since_purge >= self.PURGE_EVERY:
+            self.purge()
+
+    def purge(self) -> int:
+        now = time.time()
+        expired = [pair for pair, expires_at in self._used.items() if expires_at <= now]
+        for pair in expired:
+            del self._used[pair]
+        self._adds_since_purge = 0
+        return len(expired)
+
+    def verify(self, user_id, secret: str, code: str, now: Optional[float] = None) -> Optional[int]:
+        """Return the accepted time step, or None for a wrong or replayed code."""
+        user_id = str(user_id)
+        code = (code or "").replace(" ", "")
+        if len(code) != self.digits or not code.isdigit():
+            self.rejected += 1
+            return None
+        key = self._key(user_id, secret)
+        current = int((time.time() if now is None else now) // self.interval)
+
+        # Every step in the window is compared, so timing does not reveal which matched
+        matched = None
+        for step in range(current - self.valid_window, current + self.valid_window + 1):
+            if hmac.compare_digest(totp_code(key, step, self.digits), code):
+                matched = step
+        if matched is None:
+            self.rejected += 1
+            return None
+        if (user_id, matched) in self._used:
+            self.replays += 1
+            return None
+        self.mark_used(user_id, matched)
+        self.verified += 1
+        return matched
+
+    def handle_notification(self, payload: str) -> None:
+        user_id, _, step = payload.rpartition(":")
+        self.mark_used(user_id, int(step))
+
+    def stats(self) -> dict:
+        return {
+            "keys_cached": len(self._keys),
+            "used_steps": len(self._used),
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "replays": self.replays,
+            "key_hits": self.key_hits,
+            "key_misses": self.key_misses,
+        }
+
+
+async def publish_totp_used(db, user_id, step: int) -> None:
+    """Tell every other worker, once ``db`` commits, that this step was consumed."""
+    await db.execute(notify_statement(TOTP_USED, f"{user_id}:{step}"))
+
+
+totp_verifier = TotpVerifier(settings.TOTP_VALID_WINDOW, settings.TOTP_KEY_CACHE_SIZE)
+register_stats_source("totp", totp_verifier.stats)
+
+listener.subscribe(TOTP_USED, totp_verifier.handle_notification)
@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import update
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.config import settings
+from app.core.metrics import register_stats_source
+from app.core.notify import USER_CHANGED, listener, notify_statement
+from app.models.user import User
+
+
+class UserCache:
+    """TTL + size bounded LRU of user column values keyed by JWT ``sub``.
+
+    Values are plain dicts rather than ORM instances so an entry is never
+    bound to (or mutated through) another request's session.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, values = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return values
+
+    def set(self, key: str, values: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, values)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# Table columns, not mapper attributes: inspecting the mapper here would
+# configure relationships before every model module is imported
+_user_columns = [column.key for column in User.__table__.columns]
+
+def snapshot_user(user: User) -> Dict[str, Any]:
+    return {key: getattr(user, key) for key in _user_columns}
+
+def restore_user(values: Dict[str, Any]) -> User:
+    # Detached with an identity key: db.add() on it issues an UPDATE, not an INSERT
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+async def publish_user_changed(db, username: str) -> None:
+    """Invalidate a cached user here and, once ``db`` commits, in every other worker."""
+    user_cache.invalidate(username)
+    await db.execute(notify_statement(USER_CHANGED, username))
+
+
+async def publish_sessions_changed(db, user_ids: Iterable) -> None:
+    """Bump ``sessions_version`` of each user so cached session lists stop matching their ETag."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    # updated_at is left alone: the profile did not change
+    usernames = (await db.scalars(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(sessions_version=User.sessions_version + 1, updated_at=User.updated_at)
+        .returning(User.username)
+        .execution_options(synchronize_session=False)
+    )).all()
+    for username in usernames:
+        await publish_user_changed(db, username)
+
+
+user_cache = UserCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS)
+register_stats_source("user_cache", user_cache.stats)
+
+async def _clear_user_cache() -> None:
+    user_cache.clear()
+
+# Our own NOTIFY comes back here too, which also covers reads that raced the commit
+listener.subscribe(USER_CHANGED, user_cache.invalidate)
+listener.on_reconnect(_clear_user_cache)
@@ -0,0 +1,248 @@
+import csv
+import io
+import json
+import logging
+import time
+from itertools import islice
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import copy_records, open_session
+from app.core.hashing import hashing_executor
+from app.core.notify import USER_CHANGED
+from app.core.security import hash_passwords
+from app.core.user_cache import user_cache
+from app.schemas.user import UserImportError, UserImportReport, UserImportRow
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+ON_CONFLICT = ("skip", "update")
+
+_STAGING = "user_import_staging"
+_COLUMNS = (
+    "line_no", "username", "email", "hashed_password", "first_name", "last_name",
+    "role", "phone", "bio", "location", "avatar_url", "is_active",
+)
+
+# Dropped with the batch transaction
+_CREATE_STAGING = text(f"""
+    CREATE TEMP TABLE {_STAGING} (
+        line_no INTEGER NOT NULL,
+        username VARCHAR(50) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        hashed_password VARCHAR(255) NOT NULL,
+        first_name VARCHAR(100),
+        last_name VARCHAR(100),
+        role VARCHAR(50),
+        phone VARCHAR(20),
+        bio TEXT,
+        location VARCHAR(100),
+        avatar_url TEXT,
+        is_active BOOLEAN
+    ) ON COMMIT DROP
+""")
+
+# Only rows matching on both username and email count as the same user;
+# role and is_active stay NULL in staging unless the file set them, so an
+# update keeps the stored values. The NOTIFY drops the rows from the API
+# workers' caches on commit
+_UPDATE_EXISTING = text(f"""
+    WITH updated AS (
+        UPDATE auth.users u SET
+            hashed_password = s.hashed_password,
+            first_name = COALESCE(s.first_name, u.first_name),
+            last_name = COALESCE(s.last_name, u.last_name),
+            role = COALESCE(s.role, u.role),
+            phone = COALESCE(s.phone, u.phone),
+            bio = COALESCE(s.bio, u.bio),
+            location = COALESCE(s.location, u.location),
+            avatar_url = COALESCE(s.avatar_url, u.avatar_url),
+            is_active = COALESCE(s.is_active, u.is_active),
+            updated_at = CURRENT_TIMESTAMP
+        FROM {_STAGING} s
+        WHERE u.username = s.username AND u.email = s.email
+        RETURNING u.username
+    )
+    SELECT username, pg_notify(:channel, username) FROM updated
+""")
+
+# Without a conflict target DO NOTHING covers the username and email keys,
+# including their case-insensitive indexes
+_INSERT_NEW = text(f"""
+    INSERT INTO auth.users (
+        username, email, hashed_password, first_name, last_name,
+        role, phone, bio, location, avatar_url, is_active
+    )
+    SELECT username, email, hashed_password, first_name, last_name,
+           COALESCE(role, 'user'), phone, bio, location, avatar_url, COALESCE(is_active, TRUE)
+    FROM {_STAGING}
+    ORDER BY line_no
+    ON CONFLICT DO NOTHING
+    RETURNING username
+""")
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def iter_records(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(line, record)`` pairs one at a time; unparsable lines yield the error."""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text_stream)
+            for record in reader:
+                # CSV has no NULL, an empty cell means the field is not set
+                yield reader.line_num, {
+                    key: value for key, value in record.items()
+                    if key is not None and value not in ("", None)
+                }
+        else:
+            for line_no, line in enumerate(text_stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError as e:
+                    yield line_no, e
+    finally:
+        # Leave the caller's stream open
+        text_stream.detach()
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+            for item in error.errors()
+        )
+    return str(error)
+
+
+class UserImporter:
+    """Loads users from a CSV or NDJSON stream in batches.
+
+    Each batch is validated against ``UserImportRow``, hashed in chunks on the
+    hashing pool, COPYed into a temporary staging table and merged into
+    auth.users with set-based statements. Rows that fail are reported by line
+    and never abort the import.
+    """
+
+    def __init__(
+        self,
+        on_conflict: str = "skip",
+        batch_size: int = settings.USER_IMPORT_BATCH_SIZE,
+        hash_chunk: int = settings.USER_IMPORT_HASH_CHUNK,
+        hash_parallelism: Optional[int] = settings.USER_IMPORT_HASH_PARALLELISM,
+        max_errors: int = settings.USER_IMPORT_MAX_ERRORS,
+    ):
+        if on_conflict not in ON_CONFLICT:
+            raise ValueError(f"Unknown conflict mode: {on_conflict}")
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size
+        self.hash_chunk = hash_chunk
+        self.hash_parallelism = hash_parallelism or max(hashing_executor.workers // 2, 1)
+        self.max_errors = max_errors
+        self.report = UserImportReport()
+        self._seen_usernames: set = set()
+        self._seen_emails: set = set()
+
+    def _error(self, line: int, message: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append(UserImportError(line=line, error=message))
+        else:
+            self.report.errors_truncated = True
+
+    def _fail_batch(self, rows: List[Tuple[int, UserImportRow]], message: str) -> None:
+        for line, _ in rows:
+            self._error(line, message)
+
+    def _validate(self, batch: List[Tuple[int, Any]]) -> List[Tuple[int, UserImportRow]]:
+        rows = []
+        for line, record in batch:
+            self.report.processed += 1
+            if isinstance(record, Exception):
+                self._error(line, f"Invalid JSON: {record}")
+                continue
+            try:
+                row = UserImportRow.model_validate(record)
+            except ValidationError as e:
+                self._error(line, _describe(e))
+                continue
+            if row.username in self._seen_usernames or row.email in self._seen_emails:
+                self._error(line, "Duplicate username or email earlier in the file")
+                continue
+            self._seen_usernames.add(row.username)
+            self._seen_emails.add(row.email)
+            rows.append((line, row))
+        return rows
+
+    async def _load(self, rows: List[Tuple[int, UserImportRow]]) -> None:
+        try:
+            hashes = await hash_passwords(
+                [row.password for _, row in rows], self.hash_chunk, self.hash_parallelism
+            )
+        except Exception:
+            # Usually the hashing queue timing out under login load; earlier
+            # batches are committed already, so report and go on
+            logger.exception("Hashing passwords for a batch of %d users failed", len(rows))
+            self._fail_batch(rows, "Batch failed: password hashing unavailable, retry these rows")
+            return
+        records = [
+            (line, row.username, row.email, hashed, row.first_name, row.last_name,
+             row.role if "role" in row.model_fields_set else None,
+             row.phone, row.bio, row.location, row.avatar_url,
+             row.is_active if "is_active" in row.model_fields_set else None)
+            for (line, row), hashed in zip(rows, hashes)
+        ]
+        try:
+            async with open_session() as db:
+                await db.execute(_CREATE_STAGING)
+                await copy_records(db, _STAGING, _COLUMNS, records)
+                updated = set()
+                if self.on_conflict == "update":
+                    updated = set((await db.scalars(_UPDATE_EXISTING, {"channel": USER_CHANGED})).all())
+                created = set((await db.scalars(_INSERT_NEW)).all())
+                await db.commit()
+        except Exception as e:
+            logger.exception("Importing a batch of %d users failed", len(rows))
+            self._fail_batch(rows, f"Batch failed: {e.__class__.__name__}")
+            return
+
+        for username in updated:
+            user_cache.invalidate(username)
+        self.report.created += len(created)
+        self.report.updated += len(updated)
+        for line, row in rows:
+            if row.username in created or row.username in updated:
+                continue
+            if self.on_conflict == "update":
+                self._error(line, "Username or email belongs to a different user")
+            else:
+                self.report.skipped += 1
+
+    async def run(self, stream: BinaryIO, fmt: str) -> UserImportReport:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown import format: {fmt}")
+        start = time.perf_counter()
+        records = iter_records(stream, fmt)
+        while True:
+            # Parsing reads the file, keep it off the event loop
+            batch = await run_in_threadpool(lambda: list(islice(records, self.batch_size)))
+            if not batch:
+                break
+            rows = self._validate(batch)
+            if rows:
+                await self._load(rows)
+        self.report.duration_seconds = round(time.perf_counter() - start, 3)
+        return self.report
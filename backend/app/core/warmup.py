@@ -0,0 +1,41 @@
+import asyncio
+import importlib
+import logging
+import time
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.hashing import hashing_executor
+from app.core.queries import prepare_hot_statements
+from app.core.security import warm_up_worker
+
+logger = logging.getLogger(__name__)
+
+# Imported lazily by the 2FA and token code paths otherwise
+PRELOAD_MODULES = ("pyotp", "qrcode", "qrcode.image.svg", "jose.jwt", "email_validator")
+
+
+async def _open_connection() -> None:
+    async with open_session() as db:
+        await prepare_hot_statements(db)
+
+
+async def warm_up() -> None:
+    """Pay the cold-start costs before the worker accepts its first request."""
+    start = time.perf_counter()
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+    # Sessions held at the same time force distinct pool connections
+    connections = min(settings.DB_POOL_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE)
+    if connections > 0:
+        await asyncio.gather(*(_open_connection() for _ in range(connections)))
+
+    workers = 0
+    if settings.HASH_POOL_WARMUP:
+        pids = await asyncio.gather(*(hashing_executor.run(warm_up_worker) for _ in range(hashing_executor.workers)))
+        workers = len(set(pids))
+
+    logger.info(
+        "Warm-up done in %.2fs: %d DB connections, %d hashing workers",
+        time.perf_counter() - start, connections, workers,
+    )
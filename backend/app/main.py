@@ -1,12 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db, dispose_engines
+from app.core.hashing import hashing_executor
+from app.core.notify import listener
+from app.core.revocation import revocation_index
+from app.core.activity import session_activity
+from app.core.audit import audit_log
+from app.core.rate_limit import login_limiter
+from app.core.session_reaper import session_reaper
+from app.core.warmup import warm_up
+from app.core.audit_partitions import audit_partitions
+from app.core.metrics import MetricsMiddleware, render_metrics, run_metrics_refresher, mark_process_dead
+from app.core.profiling import SqlProfilerMiddleware
 from app.api.v1 import auth, users, sessions, two_factor
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title=settings.APP_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # LISTEN before warming so no revocation falls between the two
+    await listener.start()
+    await revocation_index.warm()
+    await login_limiter.load()
+    await warm_up()
+    session_activity.start()
+    audit_log.start()
+    login_limiter.start()
+    session_reaper.start()
+    audit_partitions.start()
+    metrics_refresher = asyncio.create_task(run_metrics_refresher())
+    yield
+    metrics_refresher.cancel()
+    await audit_partitions.stop()
+    await session_reaper.stop()
+    await login_limiter.stop()
+    await session_activity.stop()
+    await audit_log.stop()
+    await listener.stop()
+    hashing_executor.shutdown()
+    await dispose_engines()
+    mark_process_dead()
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 # Set up CORS
 origins = [
@@ -21,6 +59,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(SqlProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
@@ -31,11 +71,15 @@ app.include_router(two_factor.router, prefix="/api/v1/auth/2fa", tags=["2fa"])
 def read_root():
     return {"message": f"Welcome to {settings.APP_NAME}"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return render_metrics()
+
 @app.get("/health")
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     try:
         # Try to execute a simple query to verify DB connection
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         return {"status": "ok", "database": "connected"}
     except Exception as e:
         return {"status": "error", "database": "disconnected", "detail": str(e)}
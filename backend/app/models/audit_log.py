@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.core.database import Base
+
+class AuditLog(Base):
+    __tablename__ = "audit_logs"
+    __table_args__ = {"schema": "auth"}
+
+    # Partitioned by created_at, which therefore is part of the primary key
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("auth.users.id", ondelete="SET NULL"))
+    action = Column(String(50), nullable=False)
+    ip_address = Column(String(45))
+    user_agent = Column(Text)
+    details = Column(JSONB)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=text("CURRENT_TIMESTAMP"))
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+class LoginAttempt(Base):
+    __tablename__ = "login_attempts"
+    __table_args__ = (
+        UniqueConstraint("ip_address", "email"),
+        {"schema": "auth"},
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    ip_address = Column(String(45), nullable=False)
+    # Holds the login identifier as typed, which may be a username
+    email = Column(String(255), nullable=False)
+    attempt_count = Column(Integer, default=1)
+    last_attempt_at = Column(DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+    is_locked = Column(Boolean, default=False)
+    locked_until = Column(DateTime(timezone=True))
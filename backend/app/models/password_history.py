@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+class PasswordHistory(Base):
+    __tablename__ = "password_history"
+    __table_args__ = {"schema": "auth"}
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False)
+    hashed_password = Column(String(255), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, text
+from sqlalchemy import Column, String, CHAR, Boolean, DateTime, ForeignKey, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -10,11 +10,14 @@ class Session(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False)
-    refresh_token = Column(String(255), unique=True, nullable=False)
+    # SHA-256 hex digests of the current and the last rotated refresh token
+    refresh_token_hash = Column("refresh_token", CHAR(64), unique=True, nullable=False)
+    previous_refresh_token_hash = Column("previous_refresh_token", CHAR(64), unique=True)
     user_agent = Column(String)
     ip_address = Column(String(45))
     location = Column(String(100))
     is_revoked = Column(Boolean, default=False)
+    revoked_at = Column(DateTime(timezone=True))
     expires_at = Column(DateTime(timezone=True), nullable=False)
     last_active_at = Column(DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
     created_at = Column(DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, text, ForeignKey
+from sqlalchemy import BigInteger, Column, String, Text, Boolean, DateTime, text, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -24,5 +24,7 @@ class User(Base):
     avatar_url = Column(Text)
     is_active = Column(Boolean, default=True)
     is_2fa_enabled = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped on login and revocation, see publish_sessions_changed
+    sessions_version = Column(BigInteger, nullable=False, server_default=text("0"))
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+from typing import Any, Dict, Optional
+
+class AuditLogRead(BaseModel):
+    id: UUID
+    action: str
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -6,5 +6,8 @@ class Token(BaseModel):
     token_type: str
     refresh_token: str
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     username: Optional[str] = None
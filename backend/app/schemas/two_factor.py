@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List
 
 class TwoFactorSetupResponse(BaseModel):
     secret: str
@@ -9,3 +10,10 @@ class TwoFactorEnableRequest(BaseModel):
 
 class TwoFactorVerifyRequest(BaseModel):
     token: str
+
+class BackupCodesResponse(BaseModel):
+    # Shown once; only digests are stored
+    codes: List[str]
+
+class BackupCodesStatus(BaseModel):
+    remaining: int
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -30,3 +30,52 @@ class UserUpdate(BaseModel):
     bio: Optional[str] = None
     location: Optional[str] = None
     # Email/Username updates might require special handling (verification), keeping it simple for now or restricted
+
+class PasswordChangeRequest(BaseModel):
+    current_password: str
+    new_password: str = Field(min_length=8)
+
+class UserListItem(BaseModel):
+    id: UUID
+    username: str
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    role: str
+    is_active: bool
+    is_2fa_enabled: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class UserPage(BaseModel):
+    items: List[UserListItem]
+    # Opaque cursor for the next page, None on the last one
+    next_cursor: Optional[str] = None
+
+class UserImportRow(UserBase):
+    # Lengths follow auth.users so a bad row fails validation, not the COPY
+    username: str = Field(min_length=1, max_length=50)
+    email: EmailStr = Field(max_length=255)
+    password: str = Field(min_length=8)
+    first_name: Optional[str] = Field(None, max_length=100)
+    last_name: Optional[str] = Field(None, max_length=100)
+    phone: Optional[str] = Field(None, max_length=20)
+    location: Optional[str] = Field(None, max_length=100)
+    role: str = Field("user", max_length=50)
+    is_active: bool = True
+
+class UserImportError(BaseModel):
+    line: int
+    error: str
+
+class UserImportReport(BaseModel):
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[UserImportError] = []
+    errors_truncated: bool = False
+    duration_seconds: float = 0.0
@@ -0,0 +1,9 @@
+"""In-process load benchmarks for the auth API.
+
+Run from the backend directory::
+
+    python -m bench run --concurrency 1,10,50 --requests 200
+    python -m bench compare bench/results/<before>.json bench/results/<after>.json
+
+See ``python -m bench run --help`` for scenarios and options.
+"""
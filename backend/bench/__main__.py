@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_SCENARIOS = "login,login_2fa,me,sessions_list,session_revoke,2fa_setup"
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> None:
+    from bench.database import Seeder, apply_schema, create_database, drop_database
+
+    db_name = f"arima_bench_{uuid.uuid4().hex[:8]}"
+    print(f"Creating disposable database {db_name}")
+    await create_database(db_name)
+    try:
+        # Settings are read once at import, so the app must come after this
+        os.environ["POSTGRES_DB"] = db_name
+        await apply_schema(db_name)
+
+        import httpx
+        from app.core.config import settings
+        from app.core.hashing import hashing_executor
+        from app.core.security import pwd_context
+        from app.main import app
+        from bench import scenarios as bench_scenarios
+        from bench.runner import run_scenario
+
+        levels = [int(level) for level in args.concurrency.split(",")]
+        selected = bench_scenarios.build(args.scenarios.split(","))
+        per_scenario = args.warmup + args.requests * len(levels)
+        async with Seeder(db_name, pwd_context.hash(bench_scenarios.PASSWORD)) as seeder:
+            for scenario in selected:
+                await scenario.setup(seeder, per_scenario)
+
+        results = {}
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for scenario in selected:
+                    results[scenario.name] = await run_scenario(
+                        client, scenario, levels, args.requests, args.warmup
+                    )
+    finally:
+        if args.keep_db:
+            print(f"Keeping database {db_name}")
+        else:
+            await drop_database(db_name)
+
+    report = {
+        "meta": {
+            "label": args.label,
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "requests_per_level": args.requests,
+            "settings": {
+                "DB_ASYNC": settings.DB_ASYNC,
+                "DB_POOL_SIZE": settings.DB_POOL_SIZE,
+                "DB_MAX_OVERFLOW": settings.DB_MAX_OVERFLOW,
+                "PASSWORD_SCHEMES": settings.PASSWORD_SCHEMES,
+                "BCRYPT_ROUNDS": settings.BCRYPT_ROUNDS,
+                "HASH_EXECUTOR": settings.HASH_EXECUTOR,
+                "HASH_WORKERS": hashing_executor.workers,
+            },
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['commit'] or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    def change(before: float, after: float) -> float:
+        return (after - before) / before * 100 if before else 0.0
+
+    regressions = 0
+    print(f"{'scenario':<15} {'c':>4}  {'req/s':>20}  {'p50 ms':>20}  {'p95 ms':>20}  {'p99 ms':>20}")
+    for name, levels in candidate["results"].items():
+        before_levels = {level["concurrency"]: level for level in baseline["results"].get(name, [])}
+        for after in levels:
+            before = before_levels.get(after["concurrency"])
+            if before is None:
+                continue
+            cells = []
+            flagged = False
+            for metric, higher_is_worse in (("rps", False), ("p50_ms", True), ("p95_ms", True), ("p99_ms", True)):
+                delta = change(before[metric], after[metric])
+                worse = delta > args.threshold if higher_is_worse else delta < -args.threshold
+                # p50 and p99 are shown for context; rps and p95 decide
+                if worse and metric in ("rps", "p95_ms"):
+                    flagged = True
+                cells.append(f"{after[metric]:>9.1f} ({delta:+6.1f}%){'!' if worse else ' '}")
+            if after["errors"] > before["errors"]:
+                flagged = True
+            regressions += flagged
+            print(f"{name:<15} {after['concurrency']:>4}  " + "  ".join(cells) + ("  REGRESSION" if flagged else ""))
+    print(f"{regressions} regression(s) beyond {args.threshold}%")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Auth API benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser(
+        "run", help="Benchmark app.main:app in-process against a disposable database on the configured server"
+    )
+    run_parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS)
+    run_parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels")
+    run_parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    run_parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per scenario")
+    run_parser.add_argument("--label", help="Free-form note stored with the results")
+    run_parser.add_argument("--output", help="Results file, defaults to bench/results/<time>-<commit>.json")
+    run_parser.add_argument("--keep-db", action="store_true", help="Do not drop the database afterwards")
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="Percent change in req/s or p95 counted as a regression")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        asyncio.run(run(args))
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
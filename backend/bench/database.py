@@ -0,0 +1,111 @@
+import glob
+import os
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+import asyncpg
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql")
+
+
+def _dsn(database: str) -> str:
+    # Read from the environment directly: app settings must not be imported
+    # before POSTGRES_DB points at the disposable database
+    from pydantic_settings import BaseSettings
+
+    class ServerSettings(BaseSettings):
+        POSTGRES_SERVER: str
+        POSTGRES_USER: str
+        POSTGRES_PASSWORD: str
+        POSTGRES_PORT: int = 5432
+
+        class Config:
+            env_file = ".env"
+            case_sensitive = True
+            extra = "ignore"
+
+    server = ServerSettings()
+    return (f"postgresql://{server.POSTGRES_USER}:{server.POSTGRES_PASSWORD}"
+            f"@{server.POSTGRES_SERVER}:{server.POSTGRES_PORT}/{database}")
+
+
+async def create_database(name: str, maintenance_db: str = "postgres") -> None:
+    conn = await asyncpg.connect(_dsn(maintenance_db))
+    try:
+        await conn.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await conn.close()
+
+
+async def drop_database(name: str, maintenance_db: str = "postgres") -> None:
+    conn = await asyncpg.connect(_dsn(maintenance_db))
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+    finally:
+        await conn.close()
+
+
+async def apply_schema(name: str) -> None:
+    """Apply sql/*.sql except the 99-* seeders, in order."""
+    conn = await asyncpg.connect(_dsn(name))
+    try:
+        for path in sorted(glob.glob(os.path.join(SQL_DIR, "*.sql"))):
+            if os.path.basename(path).startswith("99-"):
+                continue
+            with open(path) as f:
+                await conn.execute(f.read())
+    finally:
+        await conn.close()
+
+
+class Seeder:
+    """Inserts bench fixtures directly, bypassing the API being measured."""
+
+    def __init__(self, name: str, password_hash: str):
+        self.name = name
+        self.password_hash = password_hash
+
+    async def __aenter__(self) -> "Seeder":
+        self.conn = await asyncpg.connect(_dsn(self.name))
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.conn.close()
+
+    async def users(self, prefix: str, count: int, totp_secret: str | None = None) -> List[dict]:
+        rows = [
+            (f"{prefix}_{i}", f"{prefix}_{i}@bench.invalid", self.password_hash, totp_secret is not None)
+            for i in range(count)
+        ]
+        users = await self.conn.fetch(
+            """
+            INSERT INTO auth.users (username, email, hashed_password, is_2fa_enabled, first_name, last_name)
+            SELECT username, email, hashed_password, is_2fa_enabled, 'Bench', 'User'
+            FROM unnest($1::text[], $2::text[], $3::text[], $4::boolean[])
+                AS t(username, email, hashed_password, is_2fa_enabled)
+            RETURNING id, username, email
+            """,
+            *zip(*rows),
+        )
+        if totp_secret is not None:
+            await self.conn.execute(
+                """
+                INSERT INTO auth.user_secrets (user_id, totp_secret)
+                SELECT id, $2 FROM unnest($1::uuid[]) AS t(id)
+                """,
+                [user["id"] for user in users], totp_secret,
+            )
+        return [dict(user) for user in users]
+
+    async def sessions(self, user_id: uuid.UUID, count: int) -> List[uuid.UUID]:
+        expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+        rows = await self.conn.fetch(
+            """
+            INSERT INTO auth.sessions (user_id, refresh_token, user_agent, ip_address, expires_at)
+            SELECT $1, token, 'bench', '127.0.0.1', $3 FROM unnest($2::text[]) AS t(token)
+            RETURNING id
+            """,
+            user_id, [secrets.token_hex(32) for _ in range(count)], expires_at,
+        )
+        return [row["id"] for row in rows]
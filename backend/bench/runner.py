@@ -0,0 +1,62 @@
+import asyncio
+import itertools
+import math
+import time
+from typing import List
+import httpx
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank, so p99 of 100 samples is the 99th value
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+async def run_level(client: httpx.AsyncClient, scenario, concurrency: int, requests: int, offset: int) -> dict:
+    """Send ``requests`` requests from ``concurrency`` concurrent workers."""
+    latencies: List[float] = []
+    errors: dict = {}
+    indexes = iter(range(offset, offset + requests))
+
+    async def worker():
+        for i in indexes:
+            method, url, kwargs = scenario.request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != scenario.expected_status:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(errors.values()),
+        "error_statuses": {str(status): count for status, count in errors.items()},
+        "rps": round(requests / wall, 2),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+async def run_scenario(client, scenario, levels: List[int], requests: int, warmup: int) -> List[dict]:
+    if warmup:
+        await run_level(client, scenario, 1, warmup, 0)
+    offsets = itertools.accumulate([warmup] + [requests] * len(levels))
+    results = []
+    for concurrency, offset in zip(levels, offsets):
+        result = await run_level(client, scenario, concurrency, requests, offset)
+        print(f"  {scenario.name:<15} c={concurrency:<4} {result['rps']:>9.1f} req/s  "
+              f"p50={result['p50_ms']:>8.1f}ms  p95={result['p95_ms']:>8.1f}ms  "
+              f"p99={result['p99_ms']:>8.1f}ms  errors={result['errors']}")
+        results.append(result)
+    return results
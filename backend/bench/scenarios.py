@@ -0,0 +1,120 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+from bench.database import Seeder
+
+# Imported after bench.__main__ has pointed POSTGRES_DB at the disposable database
+from app.core.security import create_access_token
+from app.core.totp import _decode_secret, totp_code
+
+API = "/api/v1"
+PASSWORD = "Bench-Passw0rd!"
+TOTP_SECRET = "JBSWY3DPEHPK3PXPJBSWY3DPEHPK3PXP"
+
+Request = Tuple[str, str, dict]
+
+
+def _bearer(username: str, session_id) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(subject=username, session_id=str(session_id))}"}
+
+
+class Scenario(ABC):
+    """One request type; ``setup`` seeds enough fixtures for ``count`` requests."""
+
+    name = ""
+    expected_status = 200
+
+    async def setup(self, seeder: Seeder, count: int) -> None:
+        pass
+
+    @abstractmethod
+    def request(self, i: int) -> Request:
+        """Method, path and httpx request kwargs of the ``i``-th request."""
+
+
+class Login(Scenario):
+    name = "login"
+
+    async def setup(self, seeder, count):
+        self.username = (await seeder.users("bench_login", 1))[0]["username"]
+
+    def request(self, i):
+        return "POST", f"{API}/auth/login", {"data": {"username": self.username, "password": PASSWORD}}
+
+
+class LoginTwoFactor(Scenario):
+    # A TOTP step is accepted once per user, so every request gets its own user
+    name = "login_2fa"
+
+    async def setup(self, seeder, count):
+        self.usernames = [user["username"] for user in await seeder.users("bench_2fa", count, TOTP_SECRET)]
+        self.key = _decode_secret(TOTP_SECRET)
+
+    def request(self, i):
+        otp = totp_code(self.key, int(time.time() // 30))
+        return "POST", f"{API}/auth/login", {
+            "data": {"username": self.usernames[i], "password": PASSWORD, "otp": otp},
+        }
+
+
+class Me(Scenario):
+    name = "me"
+
+    async def setup(self, seeder, count):
+        user = (await seeder.users("bench_me", 1))[0]
+        session_id = (await seeder.sessions(user["id"], 1))[0]
+        self.headers = _bearer(user["username"], session_id)
+
+    def request(self, i):
+        return "GET", f"{API}/users/me", {"headers": self.headers}
+
+
+class SessionsList(Scenario):
+    name = "sessions_list"
+
+    async def setup(self, seeder, count):
+        user = (await seeder.users("bench_sessions", 1))[0]
+        session_ids = await seeder.sessions(user["id"], 10)
+        self.headers = _bearer(user["username"], session_ids[0])
+
+    def request(self, i):
+        return "GET", f"{API}/sessions/", {"headers": self.headers}
+
+
+class SessionRevoke(Scenario):
+    name = "session_revoke"
+    expected_status = 204
+
+    async def setup(self, seeder, count):
+        user = (await seeder.users("bench_revoke", 1))[0]
+        session_ids = await seeder.sessions(user["id"], count + 1)
+        self.headers = _bearer(user["username"], session_ids[0])
+        self.targets = session_ids[1:]
+
+    def request(self, i):
+        return "DELETE", f"{API}/sessions/{self.targets[i]}", {"headers": self.headers}
+
+
+class TwoFactorSetup(Scenario):
+    name = "2fa_setup"
+
+    async def setup(self, seeder, count):
+        user = (await seeder.users("bench_2fa_setup", 1))[0]
+        session_id = (await seeder.sessions(user["id"], 1))[0]
+        self.headers = _bearer(user["username"], session_id)
+
+    def request(self, i):
+        return "POST", f"{API}/auth/2fa/setup", {"headers": self.headers}
+
+
+SCENARIOS: Dict[str, type] = {
+    scenario.name: scenario
+    for scenario in (Login, LoginTwoFactor, Me, SessionsList, SessionRevoke, TwoFactorSetup)
+}
+
+
+def build(names: List[str]) -> List[Scenario]:
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(unknown)} (known: {', '.join(SCENARIOS)})")
+    return [SCENARIOS[name]() for name in names]
@@ -0,0 +1,102 @@
+import argparse
+import statistics
+import time
+from app.core.config import settings
+from app.core.security import build_password_context
+
+def measure(context, samples: int) -> float:
+    """Median seconds for one hash, which is also what one verify costs."""
+    context.hash("calibration-warmup")
+    timings = []
+    for i in range(samples):
+        start = time.perf_counter()
+        context.hash(f"calibration-{i}")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def calibrate_bcrypt(target: float, samples: int):
+    results = []
+    for rounds in range(10, 17):
+        seconds = measure(build_password_context(["bcrypt"], bcrypt_rounds=rounds), samples)
+        results.append((f"bcrypt rounds={rounds}", seconds, {"BCRYPT_ROUNDS": rounds}))
+        print(f"  bcrypt rounds={rounds:<3} {seconds * 1000:8.1f} ms")
+        # Each round doubles the cost, no need to go further
+        if seconds > target * 2:
+            break
+    return results
+
+def calibrate_argon2(target: float, samples: int, memory_kib: int, parallelism: int):
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        print("  argon2-cffi is not installed, skipping argon2")
+        return []
+    results = []
+    for time_cost in range(1, 11):
+        context = build_password_context(
+            ["argon2"], argon2_time_cost=time_cost,
+            argon2_memory_cost_kib=memory_kib, argon2_parallelism=parallelism,
+        )
+        seconds = measure(context, samples)
+        results.append((
+            f"argon2 t={time_cost} m={memory_kib}KiB p={parallelism}", seconds,
+            {"ARGON2_TIME_COST": time_cost, "ARGON2_MEMORY_COST_KIB": memory_kib, "ARGON2_PARALLELISM": parallelism},
+        ))
+        print(f"  argon2 time_cost={time_cost:<3} {seconds * 1000:8.1f} ms")
+        if seconds > target * 2:
+            break
+    return results
+
+def pick(results, target: float):
+    # Strongest setting within the target, else the cheapest one measured
+    within = [result for result in results if result[1] <= target]
+    return within[-1] if within else min(results, key=lambda result: result[1])
+
+def write_env(path: str, values: dict) -> None:
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        lines = []
+    remaining = dict(values)
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in remaining:
+            lines[i] = f"{key}={remaining.pop(key)}"
+    lines.extend(f"{key}={value}" for key, value in remaining.items())
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark password hash costs on this host and record the one closest to a target latency"
+    )
+    parser.add_argument("--target-ms", type=float, default=250,
+                        help="Wanted time for one hash/verify on one core")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default=settings.PASSWORD_SCHEMES[0])
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--argon2-memory-kib", type=int, default=settings.ARGON2_MEMORY_COST_KIB)
+    parser.add_argument("--argon2-parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    parser.add_argument("--write", metavar="ENV_FILE", help="Write the chosen settings into this env file, e.g. .env")
+    args = parser.parse_args()
+    target = args.target_ms / 1000
+
+    print(f"Calibrating {args.scheme} for {args.target_ms:.0f} ms per hash")
+    if args.scheme == "bcrypt":
+        results = calibrate_bcrypt(target, args.samples)
+    else:
+        results = calibrate_argon2(target, args.samples, args.argon2_memory_kib, args.argon2_parallelism)
+    if not results:
+        raise SystemExit(1)
+
+    label, seconds, values = pick(results, target)
+    # Keep every other configured scheme for verification so existing hashes
+    # still work and get upgraded on the next login
+    schemes = [args.scheme] + [scheme for scheme in settings.PASSWORD_SCHEMES if scheme != args.scheme]
+    values = {"PASSWORD_SCHEMES": '["' + '","'.join(schemes) + '"]', **values}
+    print(f"Chosen: {label} ({seconds * 1000:.1f} ms, ~{1 / seconds:.1f} logins/s per hashing worker)")
+    for key, value in values.items():
+        print(f"  {key}={value}")
+    if args.write:
+        write_env(args.write, values)
+        print(f"Written to {args.write}; restart the API to apply. Stale hashes are upgraded on login.")
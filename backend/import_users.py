@@ -0,0 +1,36 @@
+import argparse
+import asyncio
+from app.core.database import dispose_engines
+from app.core.hashing import hashing_executor
+from app.core.user_import import UserImporter, detect_format
+
+async def import_users(path: str, fmt: str, on_conflict: str, batch_size: int):
+    # Nothing else uses the hashing pool in this process
+    importer = UserImporter(on_conflict=on_conflict, batch_size=batch_size,
+                            hash_parallelism=hashing_executor.workers)
+    try:
+        with open(path, "rb") as stream:
+            report = await importer.run(stream, fmt)
+    finally:
+        hashing_executor.shutdown()
+        await dispose_engines()
+
+    print(f"Processed {report.processed} rows in {report.duration_seconds}s: "
+          f"{report.created} created, {report.updated} updated, {report.skipped} skipped, {report.failed} failed")
+    for error in report.errors:
+        print(f"  line {error.line}: {error.error}")
+    if report.errors_truncated:
+        print("  (more errors not shown)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV or NDJSON file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    parser.add_argument("--on-conflict", choices=["skip", "update"], default="skip",
+                        help="What to do with users that already exist (same username and email)")
+    parser.add_argument("--batch-size", type=int, default=UserImporter().batch_size)
+    args = parser.parse_args()
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("cannot tell the file format, pass --format")
+    asyncio.run(import_users(args.path, fmt, args.on_conflict, args.batch_size))
@@ -0,0 +1,31 @@
+import argparse
+import asyncio
+from app.core.database import dispose_engines
+from app.core.audit_partitions import audit_partitions
+
+async def manage_partitions(months_ahead: int, retention_months: int, list_only: bool):
+    audit_partitions.months_ahead = months_ahead
+    audit_partitions.retention_months = retention_months
+    try:
+        if list_only:
+            for name in sorted(await audit_partitions.list_partitions()):
+                print(name)
+            return
+        report = await audit_partitions.run_once()
+    finally:
+        await dispose_engines()
+
+    if report is None:
+        print("Another maintenance run holds the lock, nothing done.")
+        return
+    print(f"Created {len(report['created'])} partitions: {', '.join(report['created']) or '-'}")
+    print(f"Dropped {len(report['dropped'])} partitions: {', '.join(report['dropped']) or '-'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create upcoming and drop expired monthly audit log partitions")
+    parser.add_argument("--months-ahead", type=int, default=audit_partitions.months_ahead)
+    parser.add_argument("--retention-months", type=int, default=audit_partitions.retention_months,
+                        help="Months of audit logs to keep, 0 keeps everything")
+    parser.add_argument("--list", action="store_true", help="Only list the existing partitions")
+    args = parser.parse_args()
+    asyncio.run(manage_partitions(args.months_ahead, args.retention_months, args.list))
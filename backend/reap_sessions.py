@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+from app.core.database import dispose_engines
+from app.core.session_reaper import session_reaper
+
+async def reap_sessions(batch_size: int, pause: float):
+    session_reaper.batch_size = batch_size
+    session_reaper.pause_seconds = pause
+    try:
+        report = await session_reaper.run_once()
+    finally:
+        await dispose_engines()
+
+    if report is None:
+        print("Another reaper run holds the lock, nothing done.")
+        return
+    print(f"Deleted {report['expired_deleted']} expired and {report['revoked_deleted']} revoked sessions "
+          f"in {report['batches']} batches ({report['duration_seconds']}s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete expired and revoked sessions in small batches")
+    parser.add_argument("--batch-size", type=int, default=session_reaper.batch_size)
+    parser.add_argument("--pause", type=float, default=session_reaper.pause_seconds,
+                        help="Seconds to sleep between batches")
+    args = parser.parse_args()
+    asyncio.run(reap_sessions(args.batch_size, args.pause))
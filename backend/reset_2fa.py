@@ -2,6 +2,7 @@ from app.core.database import SessionLocal
 from app.models.user import User
 from app.models.session import Session
 from app.models.user_secret import UserSecret
+from app.core.notify import USER_CHANGED, notify_statement
 
 def reset_2fa():
     db = SessionLocal()
@@ -15,6 +16,8 @@ def reset_2fa():
             # but here explicit is fine.
             db.query(UserSecret).filter(UserSecret.user_id == user.id).delete()
             
+            # Drop the user from the API workers' caches once this commits
+            db.execute(notify_statement(USER_CHANGED, user.username))
             db.commit()
             print("2FA disabled and secret removed.")
         else:
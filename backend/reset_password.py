@@ -1,9 +1,8 @@
 from app.core.database import SessionLocal
 from app.models.user import User
-from passlib.context import CryptContext
+from app.core.security import pwd_context
 from sqlalchemy import text
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.notify import USER_CHANGED, notify_statement
 
 def reset_admin_password():
     db = SessionLocal()
@@ -19,6 +18,8 @@ def reset_admin_password():
         # Direct SQL update to be 100% sure bypassing any model issues
         # But ORM is fine too.
         user.hashed_password = new_hash
+        # Drop the user from the API workers' caches once this commits
+        db.execute(notify_statement(USER_CHANGED, user.username))
         db.commit()
         db.refresh(user)
         print(f"Password updated successfully for {user.email}")
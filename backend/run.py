@@ -1,5 +1,6 @@
 import uvicorn
 import os
 
+# Development server with auto-reload; production deployments use serve.py
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
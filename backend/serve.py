@@ -0,0 +1,54 @@
+import argparse
+import glob
+import os
+import tempfile
+import uvicorn
+from app.core.config import settings
+
+def prepare_environment(workers: int) -> None:
+    """Environment the worker processes inherit; must be set before they start."""
+    # Split the cores between the web workers' hashing pools instead of giving
+    # every worker a pool as large as the machine
+    if workers > 1 and not os.environ.get("HASH_WORKERS") and not settings.HASH_WORKERS:
+        os.environ["HASH_WORKERS"] = str(max((os.cpu_count() or 1) // workers, 1))
+
+    # /metrics has to aggregate over all workers
+    if workers > 1 and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="arima-metrics-")
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        # Files left by a previous run would be summed into this one
+        for path in glob.glob(os.path.join(metrics_dir, "*.db")):
+            os.remove(path)
+
+def serve(host: str, port: int, workers: int) -> None:
+    prepare_environment(workers)
+    print(f"Starting {workers} worker(s) on {host}:{port} "
+          f"(hashing workers per process: {os.environ.get('HASH_WORKERS') or settings.HASH_WORKERS or os.cpu_count()})")
+    # SIGTERM stops accepting connections, lets in-flight requests finish for up
+    # to WEB_GRACEFUL_TIMEOUT_SECONDS, then runs the lifespan shutdown, which
+    # flushes the audit and session activity buffers
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=settings.WEB_KEEPALIVE_SECONDS,
+        backlog=settings.WEB_BACKLOG,
+        limit_concurrency=settings.WEB_LIMIT_CONCURRENCY,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT_SECONDS,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.WEB_FORWARDED_ALLOW_IPS,
+        server_header=False,
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API for production (use run.py for development)")
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS or os.cpu_count() or 1)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
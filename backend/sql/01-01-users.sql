@@ -12,7 +12,7 @@ CREATE TABLE IF NOT EXISTS auth.users (
     avatar_url TEXT,
     is_active BOOLEAN DEFAULT TRUE,
     is_2fa_enabled BOOLEAN DEFAULT FALSE,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -1,12 +1,20 @@
+-- Monthly range partitions on created_at: retention drops whole partitions and
+-- time-bounded queries only touch the months they cover.
+-- Partitions are named audit_logs_YYYY_MM and created ahead of time by
+-- auth.ensure_audit_log_partition() (01-11); the default partition only
+-- catches rows that arrive before theirs exists.
 CREATE TABLE IF NOT EXISTS auth.audit_logs (
-    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
     user_id UUID REFERENCES auth.users(id) ON DELETE SET NULL,
     action VARCHAR(50) NOT NULL,
     ip_address VARCHAR(45),
     user_agent TEXT,
     details JSONB,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
 
-CREATE INDEX idx_audit_logs_user_id ON auth.audit_logs(user_id);
-CREATE INDEX idx_audit_logs_created_at ON auth.audit_logs(created_at);
+CREATE TABLE IF NOT EXISTS auth.audit_logs_default PARTITION OF auth.audit_logs DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user_id_created_at ON auth.audit_logs(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_created_at_brin ON auth.audit_logs USING BRIN (created_at);
@@ -0,0 +1,4 @@
+ALTER TABLE auth.sessions ADD COLUMN IF NOT EXISTS revoked_at TIMESTAMP WITH TIME ZONE;
+
+-- Serves the revocation index warm-up in each API worker
+CREATE INDEX IF NOT EXISTS idx_sessions_revoked_expires_at ON auth.sessions(expires_at) WHERE is_revoked;
@@ -0,0 +1,15 @@
+-- Refresh tokens are stored as hex SHA-256 digests; the plaintext only ever
+-- leaves the server in the login/refresh response
+ALTER TABLE auth.sessions ADD COLUMN IF NOT EXISTS previous_refresh_token CHAR(64);
+
+UPDATE auth.sessions
+SET refresh_token = encode(sha256(convert_to(refresh_token, 'UTF8')), 'hex')
+WHERE length(refresh_token) <> 64;
+
+ALTER TABLE auth.sessions ALTER COLUMN refresh_token TYPE CHAR(64);
+
+-- The UNIQUE constraint on refresh_token already provides the lookup index
+DROP INDEX IF EXISTS auth.idx_sessions_refresh_token;
+
+-- Lets a rotated token be recognised when it is presented again
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_previous_refresh_token ON auth.sessions(previous_refresh_token);
@@ -0,0 +1,7 @@
+-- Keyset paths for the session reaper: it walks expired sessions by
+-- (expires_at, id) and revoked ones by (revoked_at, id)
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at_id ON auth.sessions(expires_at, id);
+CREATE INDEX IF NOT EXISTS idx_sessions_revoked_at_id ON auth.sessions(revoked_at, id) WHERE is_revoked;
+
+-- Sessions revoked before revoked_at existed start their grace period now
+UPDATE auth.sessions SET revoked_at = CURRENT_TIMESTAMP WHERE is_revoked AND revoked_at IS NULL;
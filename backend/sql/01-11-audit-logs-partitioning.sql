@@ -0,0 +1,66 @@
+-- Creates the monthly partition of auth.audit_logs containing month_start
+-- (bounds in UTC) if it does not exist yet, and returns its name
+CREATE OR REPLACE FUNCTION auth.ensure_audit_log_partition(month_start DATE) RETURNS TEXT AS $$
+DECLARE
+    start_at DATE := date_trunc('month', month_start)::date;
+    partition_name TEXT := 'audit_logs_' || to_char(start_at, 'YYYY_MM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS auth.%I PARTITION OF auth.audit_logs FOR VALUES FROM (%L) TO (%L)',
+        partition_name,
+        start_at::timestamp AT TIME ZONE 'UTC',
+        (start_at + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Databases created before partitioning have a plain audit_logs heap: move its
+-- rows into the partitioned layout from 01-04
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'auth' AND c.relname = 'audit_logs' AND c.relkind = 'r'
+    ) THEN
+        ALTER TABLE auth.audit_logs RENAME TO audit_logs_legacy;
+        -- Index names are schema-wide, free them for the new table
+        ALTER TABLE auth.audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey;
+        DROP INDEX IF EXISTS auth.idx_audit_logs_user_id;
+        DROP INDEX IF EXISTS auth.idx_audit_logs_created_at;
+
+        CREATE TABLE auth.audit_logs (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            user_id UUID REFERENCES auth.users(id) ON DELETE SET NULL,
+            action VARCHAR(50) NOT NULL,
+            ip_address VARCHAR(45),
+            user_agent TEXT,
+            details JSONB,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at);
+        CREATE TABLE auth.audit_logs_default PARTITION OF auth.audit_logs DEFAULT;
+        CREATE INDEX idx_audit_logs_user_id_created_at ON auth.audit_logs(user_id, created_at);
+        CREATE INDEX idx_audit_logs_created_at_brin ON auth.audit_logs USING BRIN (created_at);
+
+        PERFORM auth.ensure_audit_log_partition(m::date)
+        FROM generate_series(
+            date_trunc('month', (SELECT min(created_at) FROM auth.audit_logs_legacy) AT TIME ZONE 'UTC'),
+            date_trunc('month', CURRENT_TIMESTAMP AT TIME ZONE 'UTC'),
+            INTERVAL '1 month'
+        ) AS m;
+
+        INSERT INTO auth.audit_logs (id, user_id, action, ip_address, user_agent, details, created_at)
+        SELECT id, user_id, action, ip_address, user_agent, details, COALESCE(created_at, CURRENT_TIMESTAMP)
+        FROM auth.audit_logs_legacy;
+
+        DROP TABLE auth.audit_logs_legacy;
+    END IF;
+END;
+$$;
+
+-- Current month and the next two; the partition job keeps this window moving
+SELECT auth.ensure_audit_log_partition(
+    (date_trunc('month', CURRENT_TIMESTAMP AT TIME ZONE 'UTC') + make_interval(months => m))::date
+)
+FROM generate_series(0, 2) AS m;
@@ -0,0 +1,15 @@
+-- Admin user directory: keyset pagination on (created_at, id) and substring
+-- search over email/username/name
+
+-- NULLs would fall out of the keyset order
+UPDATE auth.users SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+ALTER TABLE auth.users ALTER COLUMN created_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_users_created_at_id ON auth.users(created_at DESC, id DESC);
+
+-- Trigram GIN indexes serve ILIKE '%term%'; an OR across the columns becomes a BitmapOr
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON auth.users USING GIN (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_username_trgm ON auth.users USING GIN (username gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_first_name_trgm ON auth.users USING GIN (first_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_last_name_trgm ON auth.users USING GIN (last_name gin_trgm_ops);
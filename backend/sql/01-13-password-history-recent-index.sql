@@ -0,0 +1,3 @@
+-- Password changes read and trim the newest N history rows of one user
+CREATE INDEX IF NOT EXISTS idx_password_history_user_id_created_at
+    ON auth.password_history(user_id, created_at DESC);
@@ -0,0 +1,3 @@
+-- Bumped whenever a session of the user is created, revoked or reaped; the
+-- session list ETag is derived from it
+ALTER TABLE auth.users ADD COLUMN IF NOT EXISTS sessions_version BIGINT NOT NULL DEFAULT 0;
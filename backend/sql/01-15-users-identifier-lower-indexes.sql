@@ -0,0 +1,13 @@
+-- Login matches email and username case-insensitively. Unique, so one
+-- identifier can never resolve to two accounts.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM auth.users GROUP BY lower(email) HAVING count(*) > 1)
+       OR EXISTS (SELECT 1 FROM auth.users GROUP BY lower(username) HAVING count(*) > 1) THEN
+        RAISE EXCEPTION 'auth.users has emails or usernames differing only in case, merge them first';
+    END IF;
+END;
+$$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_lower ON auth.users (lower(email));
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username_lower ON auth.users (lower(username));